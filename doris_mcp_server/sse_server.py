@@ -1004,6 +1004,8 @@ class DorisMCPSseServer:
             # --- Retained/New Tools ---
             "exec_query": "mcp_doris_exec_query",
             "get_table_schema": "mcp_doris_get_table_schema",
+            "get_table_bundle": "mcp_doris_get_table_bundle",
+            "batch": "mcp_doris_batch",
             "get_db_table_list": "mcp_doris_get_db_table_list",
             "get_db_list": "mcp_doris_get_db_list",
             "get_table_comment": "mcp_doris_get_table_comment",
@@ -1125,6 +1127,7 @@ class DorisMCPSseServer:
             # 2. For tools requiring table_name
             elif tool_name in [
                 "mcp_doris_get_table_schema", 
+                "mcp_doris_get_table_bundle", 
                 "mcp_doris_get_table_comment", 
                 "mcp_doris_get_table_column_comments", 
                 "mcp_doris_get_table_indexes"
@@ -1,6 +1,8 @@
 from .mcp_doris_tools import (
     mcp_doris_exec_query,
     mcp_doris_get_table_schema,
+    mcp_doris_get_table_bundle,
+    mcp_doris_batch,
     mcp_doris_get_db_table_list,
     mcp_doris_get_db_list,
     mcp_doris_get_table_comment,
@@ -14,6 +16,8 @@ from .mcp_doris_tools import (
 __all__ = [
     "exec_query",
     "get_table_schema",
+    "get_table_bundle",
+    "batch",
     "get_db_table_list",
     "get_db_list",
     "get_table_comment",
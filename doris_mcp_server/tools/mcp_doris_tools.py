@@ -8,19 +8,64 @@ Includes exec_query and new tools based on schema_extractor.
 """
 
 import os
+import re
 import time
-import json
+import asyncio
 import logging
-from typing import Dict, Any
-import pandas as pd
+from functools import lru_cache
+from typing import Dict, Any, Optional
 
 # --- Use absolute imports ---
 from doris_mcp_server.utils.schema_extractor import MetadataExtractor
 from doris_mcp_server.utils.sql_executor_tools import execute_sql_query
+from doris_mcp_server.utils import json_utils
 
 # Get logger
 logger = logging.getLogger("doris-mcp-tools")
 
+# Statements that change metadata cached by the extractors
+_DDL_PATTERN = re.compile(r'\s*(ALTER|DROP|CREATE|TRUNCATE|RENAME)\b', re.IGNORECASE)
+# One comment, with the whitespace before it
+_LEADING_COMMENT_PATTERN = re.compile(r'\s*(?:--[^\n]*|#[^\n]*|/\*.*?\*/)', re.DOTALL)
+
+# Upper bound of the audit log limit parameter, keeps accidental requests from scanning the whole log
+AUDIT_LOG_MAX_LIMIT = int(os.getenv("AUDIT_LOG_MAX_LIMIT", "10000"))
+
+# --- Shared metadata extractors ---
+@lru_cache(maxsize=32)
+def _cached_extractor(db_name: Optional[str]) -> MetadataExtractor:
+    return MetadataExtractor(db_name=db_name)
+
+def _get_extractor(db_name: Optional[str] = None) -> MetadataExtractor:
+    """Return the shared MetadataExtractor for db_name, so its metadata cache survives across tool calls"""
+    # One positional cache key for the default database, however the caller spells it (omitted, None or "")
+    return _cached_extractor(db_name or None)
+
+def _is_ddl(sql: str) -> bool:
+    """Whether sql is a DDL statement, ignoring leading comments"""
+    # Comments are skipped one at a time, a single pattern repeating them would backtrack on unmatched input
+    pos = 0
+    while True:
+        match = _LEADING_COMMENT_PATTERN.match(sql, pos)
+        if match is None:
+            break
+        pos = match.end()
+    return _DDL_PATTERN.match(sql, pos) is not None
+
+def invalidate_metadata_cache(db_name: Optional[str] = None) -> None:
+    """
+    Drop the cached metadata of one database, in memory and in the persistent store, e.g. after a DDL statement
+
+    Args:
+        db_name: Database whose metadata is dropped, the default database if None
+    """
+    extractor = _get_extractor(db_name)
+    extractor.clear_cache()
+    # The default database is also cached by the extractor shared by calls without db_name
+    default_extractor = _get_extractor()
+    if default_extractor is not extractor and default_extractor.db_name == extractor.db_name:
+        default_extractor.clear_cache()
+
 # --- Helper Function to format response ---
 def _format_response(success: bool, result: Any = None, error: str = None, message: str = "") -> Dict[str, Any]:
     response_data = {
@@ -28,19 +73,7 @@ def _format_response(success: bool, result: Any = None, error: str = None, messa
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
     }
     if success and result is not None:
-        # Handle DataFrame serialization
-        if isinstance(result, pd.DataFrame):
-            try:
-                # Convert DataFrame to JSON records format
-                response_data["result"] = json.loads(result.to_json(orient='records', date_format='iso'))
-            except Exception as df_err:
-                logger.error(f"DataFrame to JSON conversion failed: {df_err}")
-                # Fallback or specific error handling for DataFrame
-                response_data["result"] = {"error": "Failed to serialize DataFrame result"}
-                response_data["success"] = False # Mark as failed if serialization fails
-                response_data["error"] = f"DataFrame serialization error: {str(df_err)}"
-        else:
-            response_data["result"] = result
+        response_data["result"] = result
         response_data["message"] = message or "Operation successful" # Translated: Operation successful
     elif not success:
         response_data["error"] = error or "Unknown error" # Translated: Unknown error
@@ -50,7 +83,7 @@ def _format_response(success: bool, result: Any = None, error: str = None, messa
         "content": [
             {
                 "type": "text",
-                "text": json.dumps(response_data, ensure_ascii=False, default=str) # Use default=str for non-serializable types
+                "text": json_utils.dumps(response_data) # Non-serializable types fall back to str
             }
         ]
     }
@@ -68,7 +101,7 @@ async def mcp_doris_exec_query(sql: str = None, db_name: str = None, max_rows: i
     Returns:
         Dict[str, Any]: A dictionary containing the query result or an error.
     """
-    logger.info(f"MCP Tool Call: mcp_doris_exec_query, SQL: {sql}, DB: {db_name}, MaxRows: {max_rows}, Timeout: {timeout}")
+    logger.info("MCP Tool Call: mcp_doris_exec_query, SQL: %s, DB: %s, MaxRows: %s, Timeout: %s", sql, db_name, max_rows, timeout)
     try:
         if not sql:
             return _format_response(success=False, error="SQL statement not provided", message="Please provide the SQL statement to execute")
@@ -87,116 +120,204 @@ async def mcp_doris_exec_query(sql: str = None, db_name: str = None, max_rows: i
         exec_result = await execute_sql_query(exec_ctx)
 
         # The format returned by execute_sql_query is {'content': [{'type': 'text', 'text': json_string}]}
-        # Need to parse the internal JSON string
+        # The text is already serialized JSON in the format {"success": ..., "data": ..., "columns": ...}
+        # or {"success": false, "error": ...}, so forward it verbatim instead of parsing and re-encoding it
         if exec_result and 'content' in exec_result and len(exec_result['content']) > 0 and 'text' in exec_result['content'][0]:
-            try:
-                # Parse JSON string
-                result_data = json.loads(exec_result['content'][0]['text'])
-
-                # Directly return the parsed result obtained from execute_sql_query
-                # This result is already in the format {"success": ..., "data": ..., "columns": ...} or {"success": false, "error": ...}
-                # _format_response would wrap it again, but here we directly use the parsed data
-                # Note: This changes the original return structure of this function; it now directly returns the output of sql_executor
-                # If the _format_response wrapper needs to be maintained, the code below needs adjustment
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": json.dumps(result_data, ensure_ascii=False, default=str)
-                        }
-                    ]
-                }
-            except json.JSONDecodeError as json_err:
-                logger.error(f"Failed to parse execute_sql_query result: {json_err}")
-                return _format_response(success=False, error=str(json_err), message="Error parsing SQL execution result")
-            except Exception as parse_err:
-                logger.error(f"Unexpected error occurred while processing execute_sql_query result: {parse_err}", exc_info=True)
-                return _format_response(success=False, error=str(parse_err), message="Unknown error occurred while processing SQL execution result")
+            # A successful DDL statement may change the cached table list or schemas of the database it ran against.
+            # DDL results are small, so only their text is parsed to check for success
+            if _is_ddl(sql) and json_utils.loads(exec_result['content'][0]['text']).get("success"):
+                logger.info("DDL statement executed, invalidating metadata cache of %s", db_name or "the default database")
+                invalidate_metadata_cache(db_name)
+            return exec_result
         else:
-            logger.error(f"execute_sql_query returned an unexpected format: {exec_result}")
+            logger.error("execute_sql_query returned an unexpected format: %s", exec_result)
             return _format_response(success=False, error="SQL executor returned invalid format", message="Internal error executing SQL query")
 
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_exec_query: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_exec_query: %s", e)
+        logger.debug("Traceback for mcp_doris_exec_query failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error executing SQL query")
 
 
 async def mcp_doris_get_table_schema(table_name: str, db_name: str = None) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_table_schema, Table: {table_name}, DB: {db_name}")
+    logger.info("MCP Tool Call: mcp_doris_get_table_schema, Table: %s, DB: %s", table_name, db_name)
     if not table_name:
          return _format_response(success=False, error="Missing table_name parameter")
     try:
-        extractor = MetadataExtractor(db_name=db_name)
-        schema = extractor.get_table_schema(table_name=table_name, db_name=db_name)
+        extractor = _get_extractor(db_name)
+        schema = (await asyncio.to_thread(extractor.get_table_bundle, table_name=table_name, db_name=db_name)).get("schema")
         if not schema:
              return _format_response(success=False, error="Table not found or has no columns", message=f"Could not get schema for table {db_name or extractor.db_name}.{table_name}")
         return _format_response(success=True, result=schema)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_table_schema: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_table_schema: %s", e)
+        logger.debug("Traceback for mcp_doris_get_table_schema failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting table schema")
 
+async def mcp_doris_get_table_bundle(table_name: str, db_name: str = None) -> Dict[str, Any]:
+    """
+    Gets schema, table comment, column comments and indexes of a table in a single database round-trip.
+
+    Args:
+        table_name (str): Name of the table to query.
+        db_name (str, optional): Target database name. Defaults to the configured default database.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing {"schema", "comment", "column_comments", "indexes"} or an error.
+    """
+    logger.info("MCP Tool Call: mcp_doris_get_table_bundle, Table: %s, DB: %s", table_name, db_name)
+    if not table_name:
+         return _format_response(success=False, error="Missing table_name parameter")
+    try:
+        extractor = _get_extractor(db_name)
+        bundle = await asyncio.to_thread(extractor.get_table_bundle, table_name=table_name, db_name=db_name)
+        if not bundle.get("schema"):
+             return _format_response(success=False, error="Table not found or has no columns", message=f"Could not get metadata for table {db_name or extractor.db_name}.{table_name}")
+        return _format_response(success=True, result=bundle)
+    except Exception as e:
+        logger.error("MCP tool execution failed mcp_doris_get_table_bundle: %s", e)
+        logger.debug("Traceback for mcp_doris_get_table_bundle failure", exc_info=True)
+        return _format_response(success=False, error=str(e), message="Error getting table metadata bundle")
+
+# Bundle part returned by each tool that can be batched, None for the whole bundle
+_BATCH_TOOL_PARTS = {
+    "get_table_schema": "schema",
+    "get_table_bundle": None,
+    "get_table_comment": "comment",
+    "get_table_column_comments": "column_comments",
+    "get_table_indexes": "indexes"
+}
+
+async def mcp_doris_batch(requests: list = None) -> Dict[str, Any]:
+    """
+    Runs several table metadata tool calls, fetching the metadata of each database in a single round-trip.
+
+    Args:
+        requests (list): Sub-requests of the form {"tool": <tool name>, "args": {"table_name": ..., "db_name": ...}}.
+            Supported tools: get_table_schema, get_table_bundle, get_table_comment,
+            get_table_column_comments, get_table_indexes.
+
+    Returns:
+        Dict[str, Any]: A dictionary whose result is a list with one {"tool", "success", "result" or "error"} entry per sub-request.
+    """
+    logger.info("MCP Tool Call: mcp_doris_batch, Requests: %s", len(requests or []))
+    if not requests or not isinstance(requests, list):
+        return _format_response(success=False, error="Missing requests parameter", message="Please provide a list of tool calls")
+    try:
+        # Group the tables to fetch by database
+        tables_by_db = {}
+        for request in requests:
+            if not isinstance(request, dict):
+                continue
+            args = request.get("args") or {}
+            if request.get("tool") in _BATCH_TOOL_PARTS and args.get("table_name"):
+                tables_by_db.setdefault(args.get("db_name"), []).append(args["table_name"])
+
+        # Databases are fetched concurrently, each in its own worker thread
+        db_results = await asyncio.gather(*(
+            asyncio.to_thread(_get_extractor(db_name).get_table_bundles, table_names, db_name=db_name)
+            for db_name, table_names in tables_by_db.items()
+        ))
+        bundles = dict(zip(tables_by_db, db_results))
+
+        results = []
+        for request in requests:
+            tool = request.get("tool") if isinstance(request, dict) else None
+            args = (request.get("args") or {}) if isinstance(request, dict) else {}
+            table_name = args.get("table_name")
+            if tool not in _BATCH_TOOL_PARTS:
+                results.append({"tool": tool, "success": False, "error": f"Tool not supported in batch: {tool}"})
+                continue
+            if not table_name:
+                results.append({"tool": tool, "success": False, "error": "Missing table_name parameter"})
+                continue
+            bundle = bundles.get(args.get("db_name"), {}).get(table_name, {})
+            part = _BATCH_TOOL_PARTS[tool]
+            if part in (None, "schema") and not bundle.get("schema"):
+                results.append({"tool": tool, "success": False, "error": "Table not found or has no columns"})
+                continue
+            results.append({"tool": tool, "success": True, "result": bundle if part is None else bundle.get(part)})
+        return _format_response(success=True, result=results)
+    except Exception as e:
+        logger.error("MCP tool execution failed mcp_doris_batch: %s", e)
+        logger.debug("Traceback for mcp_doris_batch failure", exc_info=True)
+        return _format_response(success=False, error=str(e), message="Error executing batch request")
+
 async def mcp_doris_get_db_table_list(db_name: str = None) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_db_table_list, DB: {db_name}")
+    logger.info("MCP Tool Call: mcp_doris_get_db_table_list, DB: %s", db_name)
     try:
-        extractor = MetadataExtractor(db_name=db_name)
-        tables = extractor.get_database_tables(db_name=db_name)
+        extractor = _get_extractor(db_name)
+        tables = await asyncio.to_thread(extractor.get_database_tables, db_name=db_name)
         return _format_response(success=True, result=tables)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_db_table_list: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_db_table_list: %s", e)
+        logger.debug("Traceback for mcp_doris_get_db_table_list failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting database table list")
 
 async def mcp_doris_get_db_list() -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_db_list")
+    logger.info("MCP Tool Call: mcp_doris_get_db_list")
     try:
-        extractor = MetadataExtractor()
-        databases = extractor.get_all_databases()
+        extractor = _get_extractor()
+        databases = await asyncio.to_thread(extractor.get_all_databases)
         return _format_response(success=True, result=databases)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_db_list: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_db_list: %s", e)
+        logger.debug("Traceback for mcp_doris_get_db_list failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting database list")
 
 async def mcp_doris_get_table_comment(table_name: str, db_name: str = None) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_table_comment, Table: {table_name}, DB: {db_name}")
+    logger.info("MCP Tool Call: mcp_doris_get_table_comment, Table: %s, DB: %s", table_name, db_name)
     if not table_name:
          return _format_response(success=False, error="Missing table_name parameter")
     try:
-        extractor = MetadataExtractor(db_name=db_name)
-        comment = extractor.get_table_comment(table_name=table_name, db_name=db_name)
+        extractor = _get_extractor(db_name)
+        comment = (await asyncio.to_thread(extractor.get_table_bundle, table_name=table_name, db_name=db_name)).get("comment", "")
         return _format_response(success=True, result=comment)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_table_comment: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_table_comment: %s", e)
+        logger.debug("Traceback for mcp_doris_get_table_comment failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting table comment")
 
 async def mcp_doris_get_table_column_comments(table_name: str, db_name: str = None) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_table_column_comments, Table: {table_name}, DB: {db_name}")
+    logger.info("MCP Tool Call: mcp_doris_get_table_column_comments, Table: %s, DB: %s", table_name, db_name)
     if not table_name:
          return _format_response(success=False, error="Missing table_name parameter")
     try:
-        extractor = MetadataExtractor(db_name=db_name)
-        comments = extractor.get_column_comments(table_name=table_name, db_name=db_name)
+        extractor = _get_extractor(db_name)
+        comments = (await asyncio.to_thread(extractor.get_table_bundle, table_name=table_name, db_name=db_name)).get("column_comments", {})
         return _format_response(success=True, result=comments)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_table_column_comments: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_table_column_comments: %s", e)
+        logger.debug("Traceback for mcp_doris_get_table_column_comments failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting column comments")
 
 async def mcp_doris_get_table_indexes(table_name: str, db_name: str = None) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_table_indexes, Table: {table_name}, DB: {db_name}")
+    logger.info("MCP Tool Call: mcp_doris_get_table_indexes, Table: %s, DB: %s", table_name, db_name)
     if not table_name:
          return _format_response(success=False, error="Missing table_name parameter")
     try:
-        extractor = MetadataExtractor(db_name=db_name)
-        indexes = extractor.get_table_indexes(table_name=table_name, db_name=db_name)
+        extractor = _get_extractor(db_name)
+        indexes = (await asyncio.to_thread(extractor.get_table_bundle, table_name=table_name, db_name=db_name)).get("indexes", [])
         return _format_response(success=True, result=indexes)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_table_indexes: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_table_indexes: %s", e)
+        logger.debug("Traceback for mcp_doris_get_table_indexes failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting table indexes")
 
 async def mcp_doris_get_recent_audit_logs(days: int = 7, limit: int = 100) -> Dict[str, Any]:
-    logger.info(f"MCP Tool Call: mcp_doris_get_recent_audit_logs, Days: {days}, Limit: {limit}")
+    logger.info("MCP Tool Call: mcp_doris_get_recent_audit_logs, Days: %s, Limit: %s", days, limit)
+    try:
+        days, limit = int(days), int(limit)
+    except (TypeError, ValueError):
+        return _format_response(success=False, error="days and limit parameters must be integers")
+    if days < 1 or not 1 <= limit <= AUDIT_LOG_MAX_LIMIT:
+        return _format_response(success=False, error=f"days must be at least 1 and limit between 1 and {AUDIT_LOG_MAX_LIMIT}", message="Invalid audit log parameters")
     try:
-        extractor = MetadataExtractor()
-        logs_df = extractor.get_recent_audit_logs(days=days, limit=limit)
-        return _format_response(success=True, result=logs_df)
+        extractor = _get_extractor()
+        # Plain row dicts are encoded directly, without a DataFrame in between
+        logs = await asyncio.to_thread(extractor.get_recent_audit_log_records, days=days, limit=limit)
+        return _format_response(success=True, result=logs)
     except Exception as e:
-        logger.error(f"MCP tool execution failed mcp_doris_get_recent_audit_logs: {str(e)}", exc_info=True)
+        logger.error("MCP tool execution failed mcp_doris_get_recent_audit_logs: %s", e)
+        logger.debug("Traceback for mcp_doris_get_recent_audit_logs failure", exc_info=True)
         return _format_response(success=False, error=str(e), message="Error getting audit logs")
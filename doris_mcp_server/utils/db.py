@@ -1,11 +1,14 @@
 import os
 import json
-import pymysql
-import pandas as pd
-from typing import Dict, List, Optional, Any
+from doris_mcp_server.utils import db_driver
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Any, Sequence
 from dotenv import load_dotenv
 import re
 
+if TYPE_CHECKING:
+    # pandas is imported on first use by the DataFrame helpers, it is slow to import
+    import pandas as pd
+
 # Load environment variables
 load_dotenv(override=True)
 
@@ -17,39 +20,44 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD", ""),
     "database": os.getenv("DB_DATABASE", ""),
     "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor
+    "cursorclass": db_driver.DictCursor
 }
 
-def get_db_connection(db_name: Optional[str] = None):
+def get_db_connection(db_name: Optional[str] = None, multi_statements: bool = False):
     """
     Get database connection
     
     Args:
         db_name: Specify the database name to connect to, use default config if None
+        multi_statements: Allow several ';'-separated statements in one execute call
     
     Returns:
         Database connection
     """
-    if db_name:
-        # Use default config but override database name
+    if db_name or multi_statements:
+        # Use default config but override database name / client flags
         config = DB_CONFIG.copy()
-        config["database"] = db_name
-        return pymysql.connect(**config)
+        if db_name:
+            config["database"] = db_name
+        if multi_statements:
+            config["client_flag"] = db_driver.CLIENT.MULTI_STATEMENTS
+        return db_driver.connect(**config)
     else:
         # Use default config
-        return pymysql.connect(**DB_CONFIG)
+        return db_driver.connect(**DB_CONFIG)
 
 def get_db_name() -> str:
     """Get the currently configured default database name"""
     return DB_CONFIG["database"] or os.getenv("DB_DATABASE", "")
 
-def execute_query(sql, db_name: Optional[str] = None):
+def execute_query(sql, db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None):
     """
     Execute SQL query and return results
     
     Args:
         sql: SQL query statement
         db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
     
     Returns:
         Query results
@@ -57,44 +65,92 @@ def execute_query(sql, db_name: Optional[str] = None):
     conn = get_db_connection(db_name)
     try:
         with conn.cursor() as cursor:
-            # Set connection character set to utf8 before executing query
-            cursor.execute("SET NAMES utf8")
-            
-            # Execute the actual query
-            cursor.execute(sql)
+            # Connection character set (utf8mb4) is negotiated during connect
+            cursor.execute(sql, params)
             result = cursor.fetchall()
         return result
     finally:
         conn.close()
 
-def execute_query_df(sql, db_name: Optional[str] = None):
+def execute_query_df(sql, db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None):
     """
     Execute SQL query and return pandas DataFrame
     
     Args:
         sql: SQL query statement
         db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
     
     Returns:
         pandas DataFrame
     """
+    import pandas as pd
+    
     conn = get_db_connection(db_name)
     try:
-        # Use a temporary cursor to execute the query and get results
-        with conn.cursor() as cursor:
-            # Set connection character set to utf8 before executing query
-            cursor.execute("SET NAMES utf8")
-            
-            # Execute the actual query
-            cursor.execute(sql)
+        # Use a plain tuple cursor, column names come from cursor.description
+        with conn.cursor(db_driver.Cursor) as cursor:
+            # Connection character set (utf8mb4) is negotiated during connect
+            cursor.execute(sql, params)
             result = cursor.fetchall()
+            columns = [col[0] for col in cursor.description] if cursor.description else []
         
         # If no results, return empty DataFrame
         if not result:
             return pd.DataFrame()
             
-        # Manually convert dict results to DataFrame
-        df = pd.DataFrame(result)
-        return df
+        # Build DataFrame directly from row tuples, avoiding per-row dicts
+        return pd.DataFrame.from_records(result, columns=columns)
     finally:
-        conn.close() 
\ No newline at end of file
+        conn.close()
+
+def execute_query_stream(sql, db_name: Optional[str] = None, chunk_size: int = 1000, params: Optional[Sequence[Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Execute SQL query and stream the result rows as dictionaries
+    
+    Rows are read through an unbuffered server-side cursor chunk_size at a time, so large
+    scans are never materialized all at once. The connection is held until the iterator is exhausted or closed.
+    
+    Args:
+        sql: SQL query statement
+        db_name: Specify the database name to connect to, use default config if None
+        chunk_size: Number of rows fetched per read
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
+    
+    Yields:
+        Result rows
+    """
+    conn = get_db_connection(db_name)
+    try:
+        with conn.cursor(db_driver.SSDictCursor) as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        conn.close()
+
+def execute_multi_query(sqls: List[str], db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Execute several SQL statements in a single round-trip
+    
+    Args:
+        sqls: SQL statements, each producing one result set
+        db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders of all statements in order, None sends sqls unchanged
+    
+    Returns:
+        List of result rows, one entry per statement
+    """
+    conn = get_db_connection(db_name, multi_statements=True)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(";\n".join(sqls), params)
+            results = [list(cursor.fetchall())]
+            while cursor.nextset():
+                results.append(list(cursor.fetchall()))
+        return results
+    finally:
+        conn.close()
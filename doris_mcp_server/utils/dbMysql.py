@@ -1,55 +1,200 @@
 import os
 import json
-import pymysql
-import pandas as pd
-from typing import Dict, List, Optional, Any
+import time
+import threading
+from functools import lru_cache
+from doris_mcp_server.utils import db_driver
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Any, Sequence, Tuple
 from dotenv import load_dotenv
 import re
 
-# Load environment variables
-load_dotenv(override=True)
-
-# Database configuration
-DB_CONFIG = {
-    "host": os.getenv("DB_MYSQL_HOST", "192.168.91.245"),
-    "port": int(os.getenv("DB_MYSQL_PORT", "3306")),
-    "user": os.getenv("DB_MYSQL_USER", "root"),
-    "password": os.getenv("DB_MYSQL_PASSWORD", "tRstOpwalkroot0823"),
-    "database": os.getenv("DB_MYSQL_DATABASE", "announce"),
-    "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor
-}
-
-def get_db_mysql_connection(db_name: Optional[str] = None):
+if TYPE_CHECKING:
+    # pandas is imported on first use by the DataFrame helpers, it is slow to import
+    import pandas as pd
+
+# Default MySQL server socket, used when connecting to "localhost"
+DEFAULT_MYSQL_SOCKET = "/var/run/mysqld/mysqld.sock"
+
+@lru_cache(maxsize=1)
+def _get_db_config() -> Dict[str, Any]:
+    """Load the database configuration from environment variables on first use"""
+    # Load environment variables
+    load_dotenv(override=True)
+    config = {
+        "host": os.getenv("DB_MYSQL_HOST", "localhost"),
+        "port": int(os.getenv("DB_MYSQL_PORT", "3306")),
+        "user": os.getenv("DB_MYSQL_USER", "root"),
+        "password": os.getenv("DB_MYSQL_PASSWORD", ""),
+        "database": os.getenv("DB_MYSQL_DATABASE", "announce"),
+        "charset": "utf8mb4",
+        "cursorclass": db_driver.DictCursor
+    }
+    
+    # Connect through the Unix domain socket when configured, or when the server is on "localhost"
+    # (same convention as the mysql client), skipping the TCP stack
+    unix_socket = os.getenv("DB_MYSQL_SOCKET")
+    if not unix_socket and config["host"] == "localhost" and os.path.exists(DEFAULT_MYSQL_SOCKET):
+        unix_socket = DEFAULT_MYSQL_SOCKET
+    if unix_socket:
+        config["unix_socket"] = unix_socket
+        del config["host"], config["port"]
+    return config
+
+@lru_cache(maxsize=1)
+def _get_pool_config() -> Dict[str, Any]:
+    """Load the connection pool configuration from environment variables on first use"""
+    # Loads the .env file, so pool settings may come from it as well
+    _get_db_config()
+    return {
+        "max_cached": int(os.getenv("DB_MYSQL_POOL_MAX_CACHED", "8")),  # Idle connections kept per database
+        "max_size": int(os.getenv("DB_MYSQL_POOL_MAX_SIZE", "32")),  # Open connections per database (idle or in use), 0 for no limit
+        "timeout": float(os.getenv("DB_MYSQL_POOL_TIMEOUT", "30")),  # Wait this long for a free connection when the pool is full (seconds)
+        "ping_interval": int(os.getenv("DB_MYSQL_POOL_PING_INTERVAL", "60"))  # Ping connections idle longer than this (seconds)
+    }
+
+class _PooledConnection:
+    """Connection wrapper that returns the underlying connection to its pool on close()"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class _ConnectionPool:
+    """Small thread-safe pool of database connections for one database"""
+
+    def __init__(self, config: Dict[str, Any], max_cached: int = 8, max_size: int = 32, timeout: float = 30, ping_interval: float = 60):
+        self.config = config
+        self.max_cached = max_cached
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle = []  # (connection, last_used) pairs, most recently used last
+        self._open = 0  # Connections opened by the pool and not closed yet, idle or checked out
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def connection(self) -> _PooledConnection:
+        """Check out a connection, reusing an idle one when possible and waiting for one if the pool is full"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self.max_size and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No free connection to {self.config.get('database')} within {self.timeout}s ({self.max_size} open)")
+                    self._cond.wait(remaining)
+                if not self._idle:
+                    # Reserve the slot before connecting, outside the lock
+                    self._open += 1
+                    break
+                conn, last_used = self._idle.pop()
+            try:
+                # Only ping connections that may have been dropped by the server while idle
+                if time.monotonic() - last_used > self.ping_interval:
+                    db_driver.ping(conn)
+                return _PooledConnection(self, conn)
+            except Exception:
+                self._discard(conn)
+        try:
+            return _PooledConnection(self, db_driver.connect(**self.config))
+        except Exception:
+            self._free_slot()
+            raise
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full or it is unusable"""
+        if conn.open:
+            with self._cond:
+                if not self._closed and len(self._idle) < self.max_cached:
+                    self._idle.append((conn, time.monotonic()))
+                    self._cond.notify()
+                    return
+        self._discard(conn)
+
+    def close(self):
+        """Close all idle connections, connections still checked out are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def _discard(self, conn):
+        """Close a connection of the pool and free its slot"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+_POOLS: Dict[Tuple[str, bool], _ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def _get_pool(db_name: str, multi_statements: bool = False) -> _ConnectionPool:
+    """Get (lazily creating) the connection pool for a database"""
+    key = (db_name, multi_statements)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                config = _get_db_config().copy()
+                config["database"] = db_name
+                # Autocommit so reused connections never hold a stale read snapshot
+                config["autocommit"] = True
+                if multi_statements:
+                    config["client_flag"] = db_driver.CLIENT.MULTI_STATEMENTS
+                pool = _POOLS[key] = _ConnectionPool(config, **_get_pool_config())
+    return pool
+
+def get_db_mysql_connection(db_name: Optional[str] = None, multi_statements: bool = False):
     """
-    Get database connection
+    Get database connection from the connection pool
     
     Args:
         db_name: Specify the database name to connect to, use default config if None
+        multi_statements: Allow several ';'-separated statements in one execute call
     
     Returns:
-        Database connection
+        Pooled database connection, close() returns it to the pool
     """
-    if db_name:
-        # Use default config but override database name
-        config = DB_CONFIG.copy()
-        config["database"] = db_name
-        return pymysql.connect(**config)
-    else:
-        # Use default config
-        return pymysql.connect(**DB_CONFIG)
+    return _get_pool(db_name or _get_db_config()["database"], multi_statements).connection()
+
+def reload_db_config():
+    """Re-read the database configuration from the environment and drop all pooled connections"""
+    _get_db_config.cache_clear()
+    _get_pool_config.cache_clear()
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
 
 def get_db_mysql_name() -> str:
     """Get the currently configured default database name"""
-    return DB_CONFIG["database"] or os.getenv("DB_DATABASE", "")
+    return _get_db_config()["database"] or os.getenv("DB_DATABASE", "")
 
-def execute_query_mysql(sql, db_name: Optional[str] = None):
+def execute_query_mysql(sql, db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None):
     """
     Execute SQL query and return results
     
     Args:
         sql: SQL query statement
         db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
     
     Returns:
         Query results
@@ -57,44 +202,92 @@ def execute_query_mysql(sql, db_name: Optional[str] = None):
     conn = get_db_mysql_connection(db_name)
     try:
         with conn.cursor() as cursor:
-            # Set connection character set to utf8 before executing query
-            cursor.execute("SET NAMES utf8")
-            
-            # Execute the actual query
-            cursor.execute(sql)
+            # Connection character set (utf8mb4) is negotiated during connect
+            cursor.execute(sql, params)
             result = cursor.fetchall()
         return result
     finally:
         conn.close()
 
-def execute_query_df_mysql(sql, db_name: Optional[str] = None):
+def execute_query_df_mysql(sql, db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None):
     """
     Execute SQL query and return pandas DataFrame
     
     Args:
         sql: SQL query statement
         db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
     
     Returns:
         pandas DataFrame
     """
+    import pandas as pd
+    
     conn = get_db_mysql_connection(db_name)
     try:
-        # Use a temporary cursor to execute the query and get results
-        with conn.cursor() as cursor:
-            # Set connection character set to utf8 before executing query
-            cursor.execute("SET NAMES utf8")
-            
-            # Execute the actual query
-            cursor.execute(sql)
+        # Use a plain tuple cursor, column names come from cursor.description
+        with conn.cursor(db_driver.Cursor) as cursor:
+            # Connection character set (utf8mb4) is negotiated during connect
+            cursor.execute(sql, params)
             result = cursor.fetchall()
+            columns = [col[0] for col in cursor.description] if cursor.description else []
         
         # If no results, return empty DataFrame
         if not result:
             return pd.DataFrame()
             
-        # Manually convert dict results to DataFrame
-        df = pd.DataFrame(result)
-        return df
+        # Build DataFrame directly from row tuples, avoiding per-row dicts
+        return pd.DataFrame.from_records(result, columns=columns)
     finally:
-        conn.close() 
\ No newline at end of file
+        conn.close()
+
+def execute_query_stream_mysql(sql, db_name: Optional[str] = None, chunk_size: int = 1000, params: Optional[Sequence[Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Execute SQL query and stream the result rows as dictionaries
+    
+    Rows are read through an unbuffered server-side cursor chunk_size at a time, so large
+    scans are never materialized all at once. The connection is held until the iterator is exhausted or closed.
+    
+    Args:
+        sql: SQL query statement
+        db_name: Specify the database name to connect to, use default config if None
+        chunk_size: Number of rows fetched per read
+        params: Values bound to the %s placeholders in sql, None sends sql unchanged
+    
+    Yields:
+        Result rows
+    """
+    conn = get_db_mysql_connection(db_name)
+    try:
+        with conn.cursor(db_driver.SSDictCursor) as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        conn.close()
+
+def execute_multi_query_mysql(sqls: List[str], db_name: Optional[str] = None, params: Optional[Sequence[Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Execute several SQL statements in a single round-trip
+    
+    Args:
+        sqls: SQL statements, each producing one result set
+        db_name: Specify the database name to connect to, use default config if None
+        params: Values bound to the %s placeholders of all statements in order, None sends sqls unchanged
+    
+    Returns:
+        List of result rows, one entry per statement
+    """
+    conn = get_db_mysql_connection(db_name, multi_statements=True)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(";\n".join(sqls), params)
+            results = [list(cursor.fetchall())]
+            while cursor.nextset():
+                results.append(list(cursor.fetchall()))
+        return results
+    finally:
+        conn.close()
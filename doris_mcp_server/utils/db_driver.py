@@ -0,0 +1,92 @@
+"""
+MySQL Protocol Driver Selection
+
+Uses pymysql by default. Setting DB_DRIVER=mysqlclient switches to mysqlclient (MySQLdb),
+which parses the wire protocol in C and decodes wide result sets (e.g. information_schema
+scans) several times faster. Falls back to pymysql when mysqlclient is not installed.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any
+
+import pymysql
+import pymysql.cursors
+from pymysql.constants import CLIENT as _PYMYSQL_CLIENT
+
+logger = logging.getLogger("doris-mcp-db-driver")
+
+# Driver attributes readable as module attributes (db_driver.DictCursor, ...), resolved on first access
+_DRIVER_ATTRIBUTES = ("DRIVER_NAME", "CLIENT", "Cursor", "DictCursor", "SSCursor", "SSDictCursor")
+
+
+@lru_cache(maxsize=1)
+def _driver() -> SimpleNamespace:
+    """
+    Select the driver from DB_DRIVER on first use
+
+    Resolved lazily so DB_DRIVER can come from the .env file loaded by the database configuration.
+    """
+    name = os.getenv("DB_DRIVER", "pymysql").lower()
+    if name == "mysqlclient":
+        try:
+            import MySQLdb
+            import MySQLdb.cursors
+            from MySQLdb.constants import CLIENT as MYSQLDB_CLIENT
+        except ImportError:  # mysqlclient is an optional speedup
+            logger.warning("DB_DRIVER=mysqlclient but mysqlclient is not installed, falling back to pymysql")
+        else:
+            return SimpleNamespace(
+                DRIVER_NAME="mysqlclient",
+                module=MySQLdb,
+                CLIENT=MYSQLDB_CLIENT,
+                Cursor=MySQLdb.cursors.Cursor,
+                DictCursor=MySQLdb.cursors.DictCursor,
+                SSCursor=MySQLdb.cursors.SSCursor,
+                SSDictCursor=MySQLdb.cursors.SSDictCursor,
+                # MySQLdb's historical names for the database and password arguments
+                connect_arg_names={"database": "db", "password": "passwd"}
+            )
+    return SimpleNamespace(
+        DRIVER_NAME="pymysql",
+        module=None,
+        CLIENT=_PYMYSQL_CLIENT,
+        Cursor=pymysql.cursors.Cursor,
+        DictCursor=pymysql.cursors.DictCursor,
+        SSCursor=pymysql.cursors.SSCursor,
+        SSDictCursor=pymysql.cursors.SSDictCursor,
+        connect_arg_names={}
+    )
+
+
+def __getattr__(name: str) -> Any:
+    if name in _DRIVER_ATTRIBUTES:
+        return getattr(_driver(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def connect(**config: Any):
+    """
+    Open a connection with the selected driver
+
+    Args:
+        config: pymysql-style connection arguments (host, port, user, password, database,
+            charset, cursorclass, client_flag, autocommit, unix_socket)
+
+    Returns:
+        DB-API connection
+    """
+    driver = _driver()
+    if driver.module is not None:
+        return driver.module.connect(**{driver.connect_arg_names.get(key, key): value for key, value in config.items()})
+    return pymysql.connect(**config)
+
+
+def ping(conn) -> None:
+    """Check that a connection is still alive without reconnecting, raises if it was dropped"""
+    if _driver().module is not None:
+        conn.ping()
+    else:
+        conn.ping(reconnect=False)
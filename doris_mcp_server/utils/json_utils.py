@@ -0,0 +1,55 @@
+"""
+JSON Serialization Helpers
+
+Uses orjson when it is installed and falls back to the standard json module otherwise.
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for non-native types: ISO format for date/time objects, str() for everything else"""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = _default) -> str:
+    """
+    Serialize obj to a JSON string (non-ASCII characters are kept as-is)
+
+    Args:
+        obj: Object to serialize
+        default: Fallback for objects that are not natively serializable
+
+    Returns:
+        str: JSON string
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits, let the standard library handle them
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=default)
+
+
+def loads(text: Any) -> Any:
+    """
+    Parse a JSON string or bytes
+
+    Raises:
+        json.JSONDecodeError: If text is not valid JSON (orjson's error is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
@@ -5,74 +5,107 @@ Provides unified logging configuration, including:
 - General logs: Record all program execution information
 - Audit logs: Record JSON data for key operations and processing results
 - Error logs: Specifically record program exceptions and errors
+
+By default all three go to one file with the level in each line; set LOG_SPLIT_FILES=1
+to also write separate audit and error files.
 """
 
 import os
 import sys
+import atexit
+import queue
+import threading
+from contextlib import suppress
+import time
 import logging
 import logging.handlers
 from pathlib import Path
-from typing import Dict
-from datetime import datetime
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv(override=True)
-
 # Get project root directory
 PROJECT_ROOT = Path(__file__).parents[2].absolute()
 
+
+def _load_env() -> Dict[str, Any]:
+    """
+    Load the .env file and resolve the log configuration from environment variables (called once, at import)
+
+    Set DORIS_MCP_SKIP_DOTENV=1 to skip reading .env (e.g. when the environment is already provided).
+    """
+    if os.environ.get("DORIS_MCP_SKIP_DOTENV") != "1":
+        load_dotenv(override=True)
+    return {
+        "LOG_DIR": os.getenv("LOG_DIR", str(PROJECT_ROOT / "logs")),
+        "LOG_PREFIX": os.getenv("LOG_PREFIX", "doris_mcp"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO").upper(),
+        "LOG_MAX_DAYS": int(os.getenv("LOG_MAX_DAYS", "30")),
+        "CONSOLE_LOGGING": os.getenv("CONSOLE_LOGGING", "false").lower() == "true",
+        "LOG_BUFFER": int(os.getenv("LOG_BUFFER", "512")),
+        "LOG_FLUSH_INTERVAL": float(os.getenv("LOG_FLUSH_INTERVAL", "2")),
+        "STDIO_MODE": os.getenv("MCP_TRANSPORT_TYPE", "").lower() == "stdio",
+        "LOG_FAST_TIME": os.getenv("LOG_FAST_TIME") == "1",
+        "LOG_SPLIT_FILES": os.getenv("LOG_SPLIT_FILES") == "1",
+    }
+
+
 # Get log configuration from environment variables
-LOG_DIR = os.getenv("LOG_DIR", str(PROJECT_ROOT / "logs"))
-LOG_PREFIX = os.getenv("LOG_PREFIX", "doris_mcp")
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-LOG_MAX_DAYS = int(os.getenv("LOG_MAX_DAYS", "30"))
+_env = _load_env()
+LOG_DIR = _env["LOG_DIR"]
+LOG_PREFIX = _env["LOG_PREFIX"]
+LOG_LEVEL = _env["LOG_LEVEL"]
+LOG_MAX_DAYS = _env["LOG_MAX_DAYS"]
 # Whether to output logs to the console (should be disabled when running as a service)
-CONSOLE_LOGGING = os.getenv("CONSOLE_LOGGING", "false").lower() == "true"
+CONSOLE_LOGGING = _env["CONSOLE_LOGGING"]
+# Number of records buffered per log file before they are written, ERROR and above are written at once
+LOG_BUFFER = _env["LOG_BUFFER"]
+# Interval in seconds at which buffered records are written even if the buffer is not full
+LOG_FLUSH_INTERVAL = _env["LOG_FLUSH_INTERVAL"]
 # Whether stdio transport mode is being used
-STDIO_MODE = os.getenv("MCP_TRANSPORT_TYPE", "").lower() == "stdio"
+STDIO_MODE = _env["STDIO_MODE"]
+# Whether to log the raw epoch timestamp instead of formatting a date per record (for machine-read logs)
+LOG_FAST_TIME = _env["LOG_FAST_TIME"]
+# Whether to write audit and error records to their own files as well, instead of only the general log
+LOG_SPLIT_FILES = _env["LOG_SPLIT_FILES"]
 
 def purge_old_logs():
     """Clean up expired log files"""
-    # --- Only perform cleanup in non-Stdio mode ---
+    # --- Only perform cleanup in non-Stdio mode (nothing below is printed in stdio mode) ---
     if STDIO_MODE:
         return 
+    remove = os.unlink
     try:
-        now = datetime.now()
-        log_dir = Path(LOG_DIR)
-        # Check if directory exists and is readable/writable
-        if not log_dir.is_dir() or not os.access(LOG_DIR, os.W_OK):
-             if not STDIO_MODE: # Avoid printing to stdout in stdio mode
-                  print(f"Warning: Log directory {LOG_DIR} not accessible, skipping log purge.", file=sys.stderr)
-             return
-
-        for log_file in log_dir.glob(f"{LOG_PREFIX}*.20*"):
-            # Parse date
-            file_name = log_file.name
-            date_str = None
-            
-            # Try to find the date part
-            parts = file_name.split('.')
-            for part in parts:
-                if part.startswith('20') and len(part) == 8:  # 20YYMMDD format
-                    date_str = part
-                    break
-            
-            if date_str:
-                try:
-                    file_date = datetime.strptime(date_str, '%Y%m%d')
-                    days_old = (now - file_date).days
-                    
-                    if days_old > LOG_MAX_DAYS:
-                        os.remove(log_file)
-                        if not STDIO_MODE:
-                            print(f"Deleted expired log file: {log_file}")
-                except (ValueError, OSError) as e:
-                    if not STDIO_MODE:
-                        print(f"Error processing log file {file_name}: {e}", file=sys.stderr)
+        # Rotated files end with a YYYYMMDD suffix, so expired ones compare below the cutoff date as strings
+        cutoff = (datetime.now() - timedelta(days=LOG_MAX_DAYS)).strftime('%Y%m%d')
+        # Permission problems surface from scandir/remove themselves instead of an os.access() probe
+        with os.scandir(LOG_DIR) as entries:
+            for entry in entries:
+                file_name = entry.name
+                # DirEntry caches the file type, so is_file() needs no extra stat() on most platforms
+                if not file_name.startswith(LOG_PREFIX) or not entry.is_file():
+                    continue
+                date_str = file_name.rsplit('.', 1)[-1]
+                if len(date_str) == 8 and date_str.isdigit() and date_str < cutoff:
+                    # A file that cannot be removed is retried on the next purge
+                    with suppress(OSError):
+                        remove(entry.path)
+                        print(f"Deleted expired log file: {entry.path}")
+    except OSError as e:
+        print(f"Warning: Log directory {LOG_DIR} not accessible, skipping log purge: {e}", file=sys.stderr)
     except Exception as e:
-        if not STDIO_MODE:
-            print(f"Error cleaning up logs: {e}", file=sys.stderr)
+        print(f"Error cleaning up logs: {e}", file=sys.stderr)
+
+# Interval between log purges in long-running processes (seconds)
+LOG_PURGE_INTERVAL = 24 * 60 * 60
+
+
+def _purge_old_logs_periodically():
+    """Purge expired logs now and schedule the next purge, runs off the main thread"""
+    purge_old_logs()
+    timer = threading.Timer(LOG_PURGE_INTERVAL, _purge_old_logs_periodically)
+    timer.daemon = True
+    timer.start()
 
 # Force disable console log output if in stdio mode
 if STDIO_MODE:
@@ -82,16 +115,18 @@ if STDIO_MODE:
 if not STDIO_MODE:
     try:
         os.makedirs(LOG_DIR, exist_ok=True)
-        # Clean up expired logs on startup (also moved here, as it only handles file logs)
-        purge_old_logs() 
+        # Clean up expired logs in the background so import does not wait for the directory scan,
+        # then again daily (also moved here, as it only handles file logs)
+        threading.Thread(target=_purge_old_logs_periodically, name='log-purge', daemon=True).start()
     except OSError as e:
         # If directory creation fails (e.g., permission issue), print warning but continue to avoid startup failure
         print(f"Warning: Failed to create log directory {LOG_DIR} or purge logs: {e}", file=sys.stderr)
 
 # Log file paths (definition still needed, but files might not be created/used)
-LOG_FILE = os.path.join(LOG_DIR, f"{LOG_PREFIX}.log")
-AUDIT_LOG_FILE = os.path.join(LOG_DIR, f"{LOG_PREFIX}.audit")
-ERROR_LOG_FILE = os.path.join(LOG_DIR, f"{LOG_PREFIX}.error")
+_LOG_BASE = f"{LOG_DIR.rstrip(os.sep)}{os.sep}{LOG_PREFIX}"
+LOG_FILE = f"{_LOG_BASE}.log"
+AUDIT_LOG_FILE = f"{_LOG_BASE}.audit"
+ERROR_LOG_FILE = f"{_LOG_BASE}.error"
 
 # Log level mapping
 LOG_LEVELS = {
@@ -102,25 +137,236 @@ LOG_LEVELS = {
     "CRITICAL": logging.CRITICAL
 }
 
+# Configured level, resolved once and set on the server loggers only, library loggers keep their own levels.
+# Each logger caches its isEnabledFor result, so records below the level are dropped before they are built
+_RESOLVED_LEVEL = LOG_LEVELS.get(LOG_LEVEL, logging.INFO)
+
 # Log format
-LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-AUDIT_FORMAT = '%(asctime)s - %(name)s - %(message)s'
-ERROR_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s'
+_TIME_FIELD = '%(created)f' if LOG_FAST_TIME else '%(asctime)s'
+LOG_FORMAT = _TIME_FIELD + ' - %(name)s - %(levelname)s - %(message)s'
+AUDIT_FORMAT = _TIME_FIELD + ' - %(name)s - %(message)s'
+ERROR_FORMAT = _TIME_FIELD + ' - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s'
+
+# Thread, process and task details are not part of any format, skip collecting them for every record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False
+
+# Formatters, built once and shared by the handlers
+_FMT_GENERAL = logging.Formatter(LOG_FORMAT)
+_FMT_AUDIT = logging.Formatter(AUDIT_FORMAT)
+_FMT_ERROR = logging.Formatter(ERROR_FORMAT)
 
 # Dedicated audit log level
 AUDIT = 25  # Level between INFO and WARNING
 logging.addLevelName(AUDIT, "AUDIT")
 
+
+def _audit(self, message, *args, **kwargs):
+    """Log a message with AUDIT level"""
+    if self.isEnabledFor(AUDIT):
+        # Report the caller of audit() rather than this function
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+        self._log(AUDIT, message, args, **kwargs)
+
+
+# Audit log method, available on every logger
+logging.Logger.audit = _audit
+
+# Name of the dedicated audit logger, whose records only go to the audit file
+AUDIT_LOGGER_NAME = 'audit'
+
 # Logger object cache
 _loggers: Dict[str, logging.Logger] = {}
 
-# Handler type mapping, used to ensure no duplicates are added
-_handler_types = {
-    'console': logging.StreamHandler,
-    'file': logging.handlers.TimedRotatingFileHandler,
-    'audit': logging.handlers.TimedRotatingFileHandler,
-    'error': logging.handlers.TimedRotatingFileHandler
-}
+# Queue between the loggers and the background listener that owns the file handlers
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_listener = None
+_buffer_handlers = []
+# Set on shutdown to stop the flush thread
+_flush_stop = threading.Event()
+
+
+def _flush_buffers():
+    """Write buffered records to the log files every LOG_FLUSH_INTERVAL seconds until shutdown, runs on its own thread"""
+    while not _flush_stop.wait(LOG_FLUSH_INTERVAL):
+        for handler in _buffer_handlers:
+            handler.flush()
+
+
+def _close_buffers():
+    """Stop the flush thread, write remaining buffered records and close the file handlers"""
+    _flush_stop.set()
+    for handler in _buffer_handlers:
+        target = handler.target
+        handler.close()
+        target.close()
+
+
+class _CallerlessLogger(logging.Logger):
+    """
+    Logger that only looks up the calling file and line for ERROR and above
+
+    Only the error format shows pathname/lineno, so the stack walk in findCaller is skipped
+    for lower levels (unless stack_info is requested).
+    """
+
+    def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=False, stacklevel=1):
+        if level >= logging.ERROR or stack_info:
+            # One more frame to skip: this override
+            super()._log(level, msg, args, exc_info, extra, stack_info, stacklevel + 1)
+            return
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        record = self.makeRecord(self.name, level, "(unknown file)", 0, msg, args,
+                                 exc_info, "(unknown function)", extra, None)
+        self.handle(record)
+
+
+class _LevelFormatter(logging.Formatter):
+    """Formatter using the error format (with source location) for ERROR and above, the general format otherwise"""
+
+    def format(self, record):
+        if record.levelno >= logging.ERROR:
+            return _FMT_ERROR.format(record)
+        return _FMT_GENERAL.format(record)
+
+
+class _ExactLevel(logging.Filter):
+    """Filter passing only records of exactly one level"""
+
+    def __init__(self, lvl: int):
+        super().__init__()
+        self.lvl = lvl
+
+    def filter(self, record):
+        return record.levelno == self.lvl
+
+
+class FastTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """
+    TimedRotatingFileHandler that does no file system checks until the rollover time is reached
+
+    Some CPython releases stat() the log file on every record since the gh-89564 fix,
+    here the "is regular file" check is cached when the file is opened.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        self._is_regular_file = os.path.isfile(self.baseFilename)
+        return stream
+
+    def shouldRollover(self, record):
+        if time.time() < self.rolloverAt:
+            return False
+        if not getattr(self, "_is_regular_file", True):
+            # Never rollover anything other than regular files (e.g. /dev/null)
+            self.rolloverAt = self.computeRollover(int(time.time()))
+            return False
+        return True
+
+
+class _RoutingQueueListener(logging.handlers.QueueListener):
+    """QueueListener writing AUDIT records of the audit logger to the audit file only"""
+
+    def __init__(self, queue, *handlers, audit_handler=None, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.audit_handler = audit_handler
+
+    def handle(self, record):
+        # Other records of the audit logger (e.g. errors) go to the regular files like any other logger's
+        if record.levelno == AUDIT and record.name == AUDIT_LOGGER_NAME and self.audit_handler is not None:
+            self.audit_handler.handle(self.prepare(record))
+            return
+        super().handle(record)
+
+
+def _create_file_handler(path: str, formatter: logging.Formatter, level: int = logging.NOTSET) -> Optional[logging.Handler]:
+    """Create a daily rotating file handler, None if the file cannot be opened"""
+    try:
+        handler = FastTimedRotatingFileHandler(
+            path,
+            when='midnight',
+            interval=1,
+            backupCount=LOG_MAX_DAYS,
+            encoding='utf-8'
+        )
+    except OSError as e:
+        print(f"Warning: Failed to add log handler for {path}: {e}", file=sys.stderr)
+        return None
+    handler.setFormatter(formatter)
+    handler.suffix = "%Y%m%d"
+    handler.setLevel(level)
+    return handler
+
+
+def _init_listener() -> Optional[logging.Handler]:
+    """
+    Start the listener thread writing to the shared file handlers
+
+    Formatting and file I/O happen on the listener thread, so logging calls only enqueue the record.
+
+    Returns:
+        The QueueHandler feeding the listener, None if no log file could be opened
+    """
+    global _listener
+    
+    handlers = [h for h in (_SHARED_FILE_H, _SHARED_AUDIT_H, _SHARED_ERROR_H) if h is not None]
+    if not handlers:
+        return None
+    
+    # Batch records in memory so each file gets one write per buffer instead of one per record
+    audit_buffer = None
+    for target in handlers:
+        buffer_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER,
+            flushLevel=logging.ERROR,
+            target=target,
+            flushOnClose=True
+        )
+        buffer_handler.setLevel(target.level)
+        _buffer_handlers.append(buffer_handler)
+        if target is _SHARED_AUDIT_H:
+            audit_buffer = buffer_handler
+    
+    # Handler levels (audit/error) are applied on the listener side
+    _listener = _RoutingQueueListener(_log_queue, *_buffer_handlers, audit_handler=audit_buffer, respect_handler_level=True)
+    _listener.start()
+    # On shutdown (exit handlers run in reverse order) drain the queue first, then the buffers
+    atexit.register(_close_buffers)
+    atexit.register(_listener.stop)
+    if LOG_FLUSH_INTERVAL > 0:
+        threading.Thread(target=_flush_buffers, name='log-flush', daemon=True).start()
+    return logging.handlers.QueueHandler(_log_queue)
+
+
+# --- Shared handlers, created once and attached to every logger ---
+# General log handler - output to console (only if enabled)
+# Use stderr instead of stdout to avoid conflicts with MCP communication
+_SHARED_CONSOLE_H = None
+if CONSOLE_LOGGING:
+    _SHARED_CONSOLE_H = logging.StreamHandler(sys.stderr)
+    _SHARED_CONSOLE_H.setFormatter(_FMT_GENERAL)
+
+# File handlers, only in non-Stdio mode: one general file with level-tagged lines,
+# plus AUDIT level only and ERROR level and above files if LOG_SPLIT_FILES is set
+_SHARED_FILE_H = _SHARED_AUDIT_H = _SHARED_ERROR_H = _SHARED_QUEUE_H = None
+if not STDIO_MODE:
+    if LOG_SPLIT_FILES:
+        _SHARED_FILE_H = _create_file_handler(LOG_FILE, _FMT_GENERAL)
+        _SHARED_AUDIT_H = _create_file_handler(AUDIT_LOG_FILE, _FMT_AUDIT, AUDIT)
+        if _SHARED_AUDIT_H is not None:
+            # The handler level already rejects records below AUDIT before the filter runs
+            _SHARED_AUDIT_H.addFilter(_ExactLevel(AUDIT))
+        _SHARED_ERROR_H = _create_file_handler(ERROR_LOG_FILE, _FMT_ERROR, logging.ERROR)
+    else:
+        # Errors keep their source location in the single file
+        _SHARED_FILE_H = _create_file_handler(LOG_FILE, _LevelFormatter())
+    _SHARED_QUEUE_H = _init_listener()
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -133,94 +379,42 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         logging.Logger: Configured logger
     """
-    if name in _loggers:
-        return _loggers[name]
+    # Lock-free fast path for already configured loggers
+    logger = _loggers.get(name)
+    if logger is not None:
+        return logger
     
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(LOG_LEVELS.get(LOG_LEVEL, logging.INFO))
+    if type(logger) is logging.Logger:
+        # Skip the caller lookup for records below ERROR
+        logger.__class__ = _CallerlessLogger
+    logger.setLevel(_RESOLVED_LEVEL)
     
     # Avoid duplicate logs caused by propagation
     logger.propagate = False
     
-    # Check if handlers already exist to avoid duplicates
-    handler_types = set(type(h) for h in logger.handlers)
-    
-    # Add audit log method
-    def audit(self, message, *args, **kwargs):
-        self.log(AUDIT, message, *args, **kwargs)
-    
-    logger.audit = audit.__get__(logger)
-    
-    # General log handler - output to console (only if enabled)
-    if CONSOLE_LOGGING and _handler_types['console'] not in handler_types:
-        # Use stderr instead of stdout to avoid conflicts with MCP communication
-        console_handler = logging.StreamHandler(sys.stderr)
-        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(console_handler)
-    
-    # --- Only add file handlers in non-Stdio mode ---
-    if not STDIO_MODE:
-        # General log handler - daily rotating file
-        if _handler_types['file'] not in handler_types:
-            try: # Add try-except block
-                file_handler = logging.handlers.TimedRotatingFileHandler(
-                    LOG_FILE,
-                    when='midnight',
-                    interval=1,
-                    backupCount=LOG_MAX_DAYS,
-                    encoding='utf-8'
-                )
-                file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-                file_handler.suffix = "%Y%m%d"
-                logger.addHandler(file_handler)
-            except OSError as e:
-                 print(f"Warning: Failed to add file log handler for {LOG_FILE}: {e}", file=sys.stderr)
-
-        # Audit log handler - only logs AUDIT level
-        if _handler_types['audit'] not in handler_types:
-            try: # Add try-except block
-                audit_handler = logging.handlers.TimedRotatingFileHandler(
-                    AUDIT_LOG_FILE,
-                    when='midnight',
-                    interval=1,
-                    backupCount=LOG_MAX_DAYS,
-                    encoding='utf-8'
-                )
-                audit_handler.setFormatter(logging.Formatter(AUDIT_FORMAT))
-                audit_handler.suffix = "%Y%m%d"
-                audit_handler.setLevel(AUDIT)
-                audit_handler.addFilter(lambda record: record.levelno == AUDIT)
-                logger.addHandler(audit_handler)
-            except OSError as e:
-                 print(f"Warning: Failed to add audit log handler for {AUDIT_LOG_FILE}: {e}", file=sys.stderr)
-
-        # Error log handler - only logs ERROR level and above
-        if _handler_types['error'] not in handler_types:
-            try: # Add try-except block
-                error_handler = logging.handlers.TimedRotatingFileHandler(
-                    ERROR_LOG_FILE,
-                    when='midnight',
-                    interval=1,
-                    backupCount=LOG_MAX_DAYS,
-                    encoding='utf-8'
-                )
-                error_handler.setFormatter(logging.Formatter(ERROR_FORMAT))
-                error_handler.suffix = "%Y%m%d"
-                error_handler.setLevel(logging.ERROR)
-                logger.addHandler(error_handler)
-            except OSError as e:
-                 print(f"Warning: Failed to add error log handler for {ERROR_LOG_FILE}: {e}", file=sys.stderr)
-
-    # Cache logger
-    _loggers[name] = logger
-    
-    return logger
+    if name == AUDIT_LOGGER_NAME and _SHARED_AUDIT_H is not None:
+        # Records below AUDIT are skipped; AUDIT records only reach the audit file, higher levels the
+        # general and error files (routed by the listener)
+        logger.setLevel(max(_RESOLVED_LEVEL, AUDIT))
+        logger.addHandler(_SHARED_QUEUE_H)
+    else:
+        # Attach the shared handlers (addHandler skips handlers already attached,
+        # so threads racing to configure the same logger cannot duplicate them)
+        if _SHARED_CONSOLE_H is not None:
+            logger.addHandler(_SHARED_CONSOLE_H)
+        # Records are only enqueued here, the file handlers run on the listener thread
+        if _SHARED_QUEUE_H is not None:
+            logger.addHandler(_SHARED_QUEUE_H)
+
+    # Cache logger, setdefault publishes it atomically (logging.getLogger returns the same instance anyway)
+    return _loggers.setdefault(name, logger)
 
 # Default logger
 logger = get_logger('doris_mcp')
 
 # Audit logger - for recording processing results, business operations, etc.
-audit_logger = get_logger('audit')
+audit_logger = get_logger(AUDIT_LOGGER_NAME)
 
 # Call to clean logs moved after directory creation, and added non-stdio check
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Persistent Metadata Store
+
+Keeps table metadata in a SQLite file so it survives process restarts. Every entry carries the
+time it was written, and callers only reuse entries younger than their max_age. Doris does not
+reliably change a table's information_schema UPDATE_TIME on schema changes, so an age limit is
+the only bound on how stale a reused entry can be. The store is best-effort: read and write
+errors are logged and treated as misses.
+
+Enabled by setting METADATA_CACHE_DIR; the store file is created in that directory.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from doris_mcp_server.utils import json_utils
+
+logger = logging.getLogger("doris-mcp-metadata-store")
+
+STORE_FILE_NAME = "metadata_cache.sqlite3"
+
+
+class MetadataStore:
+    """Key-value store with per-entry write times backed by SQLite, safe to share between threads"""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the store
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several server processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Entries of the earlier UPDATE_TIME-versioned layout cannot be aged, drop them
+        self._conn.execute("DROP TABLE IF EXISTS metadata")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+
+    def get_many(self, keys: List[str], max_age: float) -> Dict[str, Any]:
+        """
+        Get several entries with one query
+
+        Args:
+            keys: Keys to read
+            max_age: Entries written more than this many seconds ago are treated as missing
+
+        Returns:
+            Dict[str, Any]: Mapping of key to value, missing and expired keys are left out
+        """
+        if not keys:
+            return {}
+        try:
+            query = f"SELECT key, value FROM entries WHERE key IN ({', '.join('?' * len(keys))}) AND stored_at >= ?"
+            with self._lock:
+                rows = self._conn.execute(query, (*keys, time.time() - max_age)).fetchall()
+            return {key: json_utils.loads(value) for key, value in rows}
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Error reading {len(keys)} entries from metadata store: {str(e)}")
+            return {}
+
+    def set_many(self, entries: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Store several entries in one transaction
+
+        Args:
+            entries: (key, value) pairs, value must be JSON serializable
+        """
+        now = time.time()
+        rows = [(key, now, json_utils.dumps(value)) for key, value in entries]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                # The connection is in autocommit mode, open the transaction explicitly so a failure writes nothing
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany("INSERT OR REPLACE INTO entries (key, stored_at, value) VALUES (?, ?, ?)", rows)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing {len(rows)} entries to metadata store: {str(e)}")
+
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        Drop all entries whose key starts with prefix
+
+        Args:
+            prefix: Key prefix, matched literally
+        """
+        try:
+            with self._lock:
+                # substr instead of LIKE, keys contain underscores which LIKE treats as wildcards
+                self._conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as e:
+            logger.warning(f"Error deleting {prefix}* from metadata store: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            logger.warning(f"Error clearing metadata store: {str(e)}")
+
+
+@lru_cache(maxsize=None)
+def get_store(directory: str) -> Optional[MetadataStore]:
+    """
+    Return the shared store of a directory, None if it cannot be opened
+
+    Args:
+        directory: Directory holding the store file, created if missing
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        return MetadataStore(os.path.join(directory, STORE_FILE_NAME))
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Cannot open metadata store in {directory}, persistent metadata cache disabled: {str(e)}")
+        return None
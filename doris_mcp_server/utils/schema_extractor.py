@@ -6,11 +6,23 @@ Responsible for extracting table structures, relationships, and other metadata f
 
 import os
 import json
-import pandas as pd
 import re
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+import time
+from collections import defaultdict, namedtuple
+from contextlib import closing
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime
+
+try:
+    import re2
+except ImportError:  # google-re2 is an optional safeguard for user-supplied patterns
+    re2 = None
 
 # Import unified logging configuration
 from doris_mcp_server.utils.logger import get_logger
@@ -24,10 +36,202 @@ load_dotenv(override=True)
 METADATA_DB_NAME="information_schema"
 ENABLE_MULTI_DATABASE=os.getenv("ENABLE_MULTI_DATABASE",True)
 MULTI_DATABASE_NAMES=os.getenv("MULTI_DATABASE_NAMES","")
+# Databases listed by get_all_databases on both servers, overridden by TARGET_SCHEMAS
+DEFAULT_TARGET_SCHEMAS=["topwalk_dw", "announce", "asset-center", "emergency", "situation", "vulnerability", "base"]
+# Directory of the persistent table schema store, empty disables it
+METADATA_CACHE_DIR=os.getenv("METADATA_CACHE_DIR", "")
+# Stored schemas older than this many seconds are fetched again. Doris does not reliably bump
+# UPDATE_TIME on schema changes, so this is how long a change made elsewhere can go unnoticed
+METADATA_CACHE_STORE_TTL=int(os.getenv("METADATA_CACHE_STORE_TTL", "3600"))
+# Maximum number of cached metadata entries per extractor
+METADATA_CACHE_MAX_ENTRIES=max(1, int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "10000")))
+# Maximum number of metadata queries run concurrently when scanning several databases or backends
+METADATA_FETCH_CONCURRENCY=max(1, int(os.getenv("METADATA_FETCH_CONCURRENCY", "8")))
+# Number of distinct audit log statements whose simplified form, tables and comments are memoized
+SQL_ANALYSIS_CACHE_SIZE=4096
+# Statements read for SQL pattern extraction are truncated to this many characters on the server
+AUDIT_LOG_STMT_MAX_CHARS=8192
+# Each extracted SQL pattern keeps this many examples (truncated to this many characters) and comments
+SQL_PATTERN_MAX_EXAMPLES=3
+SQL_PATTERN_EXAMPLE_MAX_CHARS=2048
 
 # Import local modules
-from doris_mcp_server.utils.db import execute_query_df, execute_query
-from doris_mcp_server.utils.dbMysql import execute_query_df_mysql, execute_query_mysql
+from doris_mcp_server.utils.db import execute_query, execute_multi_query, execute_query_stream
+from doris_mcp_server.utils.dbMysql import execute_query_mysql, execute_multi_query_mysql, execute_query_stream_mysql
+from doris_mcp_server.utils.metadata_store import get_store
+from doris_mcp_server.utils import json_utils
+
+def clear_stored_metadata(db_name: Optional[str] = None) -> None:
+    """
+    Drop persisted table schemas, e.g. after a DDL statement
+
+    Args:
+        db_name: Only drop the schemas of this database; drop all if None
+    """
+    store = get_store(METADATA_CACHE_DIR) if METADATA_CACHE_DIR else None
+    if store is None:
+        return
+    if db_name is None:
+        store.clear()
+    else:
+        store.delete_prefix(f"schema_{db_name}_")
+
+def _quote_identifier(name: str) -> str:
+    """Quote a database or table name for use in a statement, escaping embedded backticks"""
+    return "`" + name.replace("`", "``") + "`"
+
+@lru_cache(maxsize=4096)
+def _show_index_sql(schema_name: str, table_name: str) -> str:
+    """SHOW INDEX statement of a table, built once per table (identifiers cannot be bound as parameters)"""
+    return f"SHOW INDEX FROM {_quote_identifier(schema_name)}.{_quote_identifier(table_name)}"
+
+@lru_cache(maxsize=None)
+def _in_placeholders(count: int) -> str:
+    """Placeholder list of an IN clause binding count parameters, e.g. "%s, %s" """
+    return ", ".join(["%s"] * count)
+
+# Query functions of the Doris connection and of the MySQL connection serving mysql_catalog_bigdata. databases
+_Backend = namedtuple("_Backend", ["execute", "stream", "execute_multi"])
+_BACKENDS = {
+    "doris": _Backend(execute_query, execute_query_stream, execute_multi_query),
+    "mysql": _Backend(execute_query_mysql, execute_query_stream_mysql, execute_multi_query_mysql)
+}
+MYSQL_CATALOG_PREFIX = "mysql_catalog_bigdata."
+
+def _resolve_database(db_name: str) -> Tuple[_Backend, str]:
+    """Return the backend serving a database and the schema name as seen by that backend"""
+    if db_name.startswith(MYSQL_CATALOG_PREFIX):
+        return _BACKENDS["mysql"], db_name[len(MYSQL_CATALOG_PREFIX):]
+    return _BACKENDS["doris"], db_name
+
+@lru_cache(maxsize=None)
+def _load_target_schemas() -> Tuple[str, ...]:
+    """
+    Load the databases listed by get_all_databases from TARGET_SCHEMAS (JSON array)
+    
+    Returns:
+        Tuple of schema names, empty to list every schema
+    """
+    target_schemas_str = os.getenv("TARGET_SCHEMAS", json.dumps(DEFAULT_TARGET_SCHEMAS))
+    try:
+        target_schemas = json.loads(target_schemas_str)
+        if isinstance(target_schemas, list):
+            return tuple(str(schema) for schema in target_schemas)
+        logger.warning("Target schema list configuration is not in list format, using default value")
+    except json.JSONDecodeError:
+        logger.warning("Error parsing target schema list JSON, using default value")
+    return tuple(DEFAULT_TARGET_SCHEMAS)
+
+# Fields of an information_schema.columns row used to build column information, in unpacking order
+_COLUMN_FIELDS = itemgetter("COLUMN_NAME", "DATA_TYPE", "IS_NULLABLE", "COLUMN_DEFAULT", "COLUMN_COMMENT", "ORDINAL_POSITION", "COLUMN_KEY", "EXTRA")
+
+def _compile_table_pattern(pattern: str):
+    """
+    Compile a user-supplied table name pattern
+    
+    Uses re2 when installed, whose matching time is linear in the table name length, so a
+    pattern such as ^(a+)+$ cannot backtrack catastrophically. Patterns re2 does not support
+    (backreferences, lookarounds) are compiled with re.
+    
+    Raises:
+        re.error: The pattern is not a valid regular expression
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+@lru_cache(maxsize=None)
+def _load_excluded_databases() -> Tuple[str, ...]:
+    """
+    Load the list of excluded databases configuration
+    
+    Returns:
+        Tuple of excluded databases
+    """
+    excluded_dbs_str = os.getenv("EXCLUDED_DATABASES", 
+                           '["information_schema", "mysql", "performance_schema", "sys", "doris_metadata"]')
+    try:
+        excluded_dbs = json.loads(excluded_dbs_str)
+        if isinstance(excluded_dbs, list):
+            logger.info(f"Loaded excluded database list: {excluded_dbs}")
+            return tuple(excluded_dbs)
+        else:
+            logger.warning("Excluded database list configuration is not in list format, using default value")
+    except json.JSONDecodeError:
+        logger.warning("Error parsing excluded database list JSON, using default value")
+    
+    # Default value
+    return ("information_schema", "mysql", "performance_schema", "sys", "doris_metadata")
+
+@lru_cache(maxsize=None)
+def _load_table_hierarchy_patterns() -> Tuple[Any, ...]:
+    """
+    Load table hierarchy matching pattern configuration
+    
+    The compiled patterns are shared by all extractors.
+    
+    Returns:
+        Tuple of compiled table hierarchy matching regular expressions
+    """
+    patterns_str = os.getenv("TABLE_HIERARCHY_PATTERNS", 
+                           '["^ads_.*$","^dim_.*$","^dws_.*$","^dwd_.*$","^ods_.*$","^tmp_.*$","^stg_.*$","^.*$"]')
+    try:
+        patterns = json.loads(patterns_str)
+        if isinstance(patterns, list):
+            # Ensure all patterns are valid regular expressions
+            compiled_patterns = []
+            for pattern in patterns:
+                try:
+                    compiled_patterns.append(_compile_table_pattern(pattern))
+                except re.error:
+                    logger.warning(f"Invalid regular expression pattern: {pattern}")
+            
+            logger.info(f"Loaded table hierarchy matching patterns: {[regex.pattern for regex in compiled_patterns]}")
+            return tuple(compiled_patterns)
+        else:
+            logger.warning("Table hierarchy matching pattern configuration is not in list format, using default value")
+    except json.JSONDecodeError:
+        logger.warning("Error parsing table hierarchy matching pattern JSON, using default value")
+    
+    # Default value
+    default_patterns = ["^ads_.*$", "^dim_.*$", "^dws_.*$", "^dwd_.*$", "^ods_.*$", "^.*$"]
+    return tuple(_compile_table_pattern(pattern) for pattern in default_patterns)
+
+# Sentinel for cache misses, cached values may be falsy
+_MISSING = object()
+
+# Patterns used to analyze audit log statements, compiled once at import
+_RE_LINE_COMMENT = re.compile(r'--.*?(\n|$)')
+_RE_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_RE_LINE_COMMENT_TEXT = re.compile(r'--\s*(.*?)(?:\n|$)')
+_RE_BLOCK_COMMENT_TEXT = re.compile(r'/\*(.*?)\*/', re.DOTALL)
+# Single- or double-quoted string literal, quotes inside it escaped by doubling ('it''s') or with a backslash ('a\'b')
+_RE_STRING_LITERAL = re.compile(
+    r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'"
+    r'|"[^"\\]*(?:(?:\\.|"")[^"\\]*)*"',
+    re.DOTALL
+)
+_RE_NUMBER_LITERAL = re.compile(r'\b\d+\b')
+_RE_IN_CLAUSE = re.compile(r'IN\s*\([^)]+\)', re.IGNORECASE)
+_RE_WHITESPACE = re.compile(r'\s+')
+_RE_FIRST_KEYWORD = re.compile(r'\s*([A-Za-z]+)')
+# Table names after FROM or JOIN (which covers DELETE FROM), INSERT INTO and UPDATE
+_RE_FROM_JOIN_TABLE = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+_RE_INSERT_TABLE = re.compile(r'\bINSERT\s+INTO\s+`?(\w+)`?', re.IGNORECASE)
+_RE_UPDATE_TABLE = re.compile(r'\bUPDATE\s+`?(\w+)`?', re.IGNORECASE)
+# Table name patterns that apply to each statement type (first keyword), statements of other
+# types (or starting with a comment) are scanned with all of them
+_TABLE_PATTERNS_BY_TYPE = {
+    "SELECT": (_RE_FROM_JOIN_TABLE,),
+    "WITH": (_RE_FROM_JOIN_TABLE,),
+    "DELETE": (_RE_FROM_JOIN_TABLE,),
+    "INSERT": (_RE_INSERT_TABLE, _RE_FROM_JOIN_TABLE),
+    "UPDATE": (_RE_UPDATE_TABLE, _RE_FROM_JOIN_TABLE)
+}
+_ALL_TABLE_PATTERNS = (_RE_FROM_JOIN_TABLE, _RE_INSERT_TABLE, _RE_UPDATE_TABLE)
 
 class MetadataExtractor:
     """Apache Doris Metadata Extractor"""
@@ -43,9 +247,14 @@ class MetadataExtractor:
         self.db_name = db_name or os.getenv("DB_DATABASE", "")
         self.metadata_db = METADATA_DB_NAME  # Use constant
         
-        # Caching system
-        self.metadata_cache = {}
-        self.metadata_cache_time = {}
+        # Caching system: key -> (monotonic time written, value), bounded to METADATA_CACHE_MAX_ENTRIES
+        # entries (oldest written evicted first)
+        self.metadata_cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        # Persistent schema store shared by all extractors, None unless METADATA_CACHE_DIR is set
+        self._store = get_store(METADATA_CACHE_DIR) if METADATA_CACHE_DIR else None
+        # One lock per key being fetched, so concurrent misses on the same key run a single query
+        self._fetch_locks: Dict[str, threading.Lock] = {}
         self.cache_ttl = int(os.getenv("METADATA_CACHE_TTL", "3600"))  # Default cache 1 hour
         
         # Refresh time
@@ -57,67 +266,86 @@ class MetadataExtractor:
         # Load table hierarchy matching configuration
         self.enable_table_hierarchy = os.getenv("ENABLE_TABLE_HIERARCHY", "false").lower() == "true"
         if self.enable_table_hierarchy:
-            self.table_hierarchy_patterns = self._load_table_hierarchy_patterns()
+            self._compiled_hierarchy_patterns = _load_table_hierarchy_patterns()
         else:
-            self.table_hierarchy_patterns = []
+            self._compiled_hierarchy_patterns = ()
         
         # List of excluded system databases
-        self.excluded_databases = self._load_excluded_databases()
+        self.excluded_databases = _load_excluded_databases()
         
-    def _load_excluded_databases(self) -> List[str]:
+    def clear_cache(self):
+        """Clear all cached metadata, including the persisted schemas of this extractor's database"""
+        self.metadata_cache.clear()
+        clear_stored_metadata(self.db_name)
+    
+    def _cache_get(self, cache_key: str, default: Any = None) -> Any:
+        """Return the cached value of a key, or default if it is missing or expired"""
+        entry = self.metadata_cache.get(cache_key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+        return default
+    
+    def _cache_set(self, cache_key: str, value: Any) -> None:
+        """Cache a value, evicting the oldest entries once the cache is full"""
+        with self._cache_lock:
+            # Re-inserting keeps the dict ordered by write time
+            self.metadata_cache.pop(cache_key, None)
+            # Monotonic seconds, unaffected by wall clock changes
+            self.metadata_cache[cache_key] = (time.monotonic(), value)
+            while len(self.metadata_cache) > METADATA_CACHE_MAX_ENTRIES:
+                del self.metadata_cache[next(iter(self.metadata_cache))]
+    
+    def _cached(self, cache_key: str, fetcher: Callable[[], Any], cache_empty: bool = True) -> Any:
         """
-        Load the list of excluded databases configuration
+        Return the cached value of a key, calling fetcher and caching its result on a miss
         
+        Concurrent misses on the same key wait for the first caller's fetch instead of
+        querying again. Exceptions raised by fetcher propagate and nothing is cached.
+        
+        Args:
+            cache_key: Cache key
+            fetcher: Function fetching the value
+            cache_empty: Whether an empty result is cached
+            
         Returns:
-            List of excluded databases
+            Any: Cached or fetched value
         """
-        excluded_dbs_str = os.getenv("EXCLUDED_DATABASES", 
-                               '["information_schema", "mysql", "performance_schema", "sys", "doris_metadata"]')
-        try:
-            excluded_dbs = json.loads(excluded_dbs_str)
-            if isinstance(excluded_dbs, list):
-                logger.info(f"Loaded excluded database list: {excluded_dbs}")
-                return excluded_dbs
-            else:
-                logger.warning("Excluded database list configuration is not in list format, using default value")
-        except json.JSONDecodeError:
-            logger.warning("Error parsing excluded database list JSON, using default value")
-        
-        # Default value
-        default_excluded_dbs = ["information_schema", "mysql", "performance_schema", "sys", "doris_metadata"]
-        return default_excluded_dbs
-        
-    def _load_table_hierarchy_patterns(self) -> List[str]:
+        value = self._cache_get(cache_key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        lock = self._fetch_locks.setdefault(cache_key, threading.Lock())
+        with lock:
+            # Another caller may have fetched the value while we waited
+            value = self._cache_get(cache_key, _MISSING)
+            if value is not _MISSING:
+                return value
+            try:
+                value = fetcher()
+                if value or cache_empty:
+                    self._cache_set(cache_key, value)
+                return value
+            finally:
+                # A newer lock may have been installed after ours was dropped by an earlier fetch, only drop our own
+                with self._cache_lock:
+                    if self._fetch_locks.get(cache_key) is lock:
+                        del self._fetch_locks[cache_key]
+    
+    @staticmethod
+    def _exec(db_name: str, query: str, *params: Any) -> List[Dict[str, Any]]:
         """
-        Load table hierarchy matching pattern configuration
+        Run a metadata query on the backend serving a database
         
+        Args:
+            db_name: Database name, its schema name as seen by the backend is bound as the first parameter
+            query: Query with %s placeholders
+            params: Parameters bound after the schema name
+            
         Returns:
-            List of table hierarchy matching regular expressions
+            List[Dict[str, Any]]: Result rows
         """
-        patterns_str = os.getenv("TABLE_HIERARCHY_PATTERNS", 
-                               '["^ads_.*$","^dim_.*$","^dws_.*$","^dwd_.*$","^ods_.*$","^tmp_.*$","^stg_.*$","^.*$"]')
-        try:
-            patterns = json.loads(patterns_str)
-            if isinstance(patterns, list):
-                # Ensure all patterns are valid regular expressions
-                validated_patterns = []
-                for pattern in patterns:
-                    try:
-                        re.compile(pattern)
-                        validated_patterns.append(pattern)
-                    except re.error:
-                        logger.warning(f"Invalid regular expression pattern: {pattern}")
-                
-                logger.info(f"Loaded table hierarchy matching patterns: {validated_patterns}")
-                return validated_patterns
-            else:
-                logger.warning("Table hierarchy matching pattern configuration is not in list format, using default value")
-        except json.JSONDecodeError:
-            logger.warning("Error parsing table hierarchy matching pattern JSON, using default value")
-        
-        # Default value
-        default_patterns = ["^ads_.*$", "^dim_.*$", "^dws_.*$", "^dwd_.*$", "^ods_.*$", "^.*$"]
-        return default_patterns
+        backend, schema_name = _resolve_database(db_name)
+        return backend.execute(query, params=(schema_name, *params))
         
     def get_all_databases(self) -> List[str]:
         """
@@ -127,42 +355,55 @@ class MetadataExtractor:
             List of database names
         """
         cache_key = "databases"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
+        def fetch():
+            # The Doris and MySQL servers are independent, query them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                doris_future = executor.submit(self._get_server_databases, "doris")
+                mysql_future = executor.submit(self._get_server_databases, "mysql")
+                databases = list(doris_future.result())
+                databases.extend(MYSQL_CATALOG_PREFIX + db for db in mysql_future.result())
+            return databases
         
         try:
+            return self._cached(cache_key, fetch)
+        except Exception as e:
+            logger.error(f"Error getting database list: {str(e)}")
+            return []
+    
+    def _get_server_databases(self, backend_name: str) -> List[str]:
+        """
+        Get the TARGET_SCHEMAS databases that exist on one server
+        
+        Args:
+            backend_name: "doris" or "mysql" (the server of mysql_catalog_bigdata. databases)
+            
+        Returns:
+            List of schema names as seen by that server, without prefix
+        """
+        def fetch():
             # Use information_schema.schemata table to get database list
-            query = """
+            target_schemas = _load_target_schemas()
+            if target_schemas:
+                placeholders = _in_placeholders(len(target_schemas))
+                condition = f"WHERE SCHEMA_NAME IN ({placeholders})"
+            else:
+                condition = ""
+            query = f"""
             SELECT 
                 SCHEMA_NAME 
             FROM 
                 information_schema.schemata 
-            WHERE 
-                SCHEMA_NAME IN ('topwalk_dw', 'announce', 'asset-center', 'emergency', 'situation', 'vulnerability', 'base')
+            {condition}
             ORDER BY 
                 SCHEMA_NAME
             """
             
-            result = execute_query(query)
-            databases = []
-            if result:
-                databases = [db["SCHEMA_NAME"] for db in result]
-                logger.info(f"Retrieved database list: {databases}")
-
-            result2 = execute_query_mysql(query)
-            if result2:
-                databases2 = ["mysql_catalog_bigdata." + db["SCHEMA_NAME"] for db in result2]
-                databases.extend(databases2)
-                logger.info(f"Retrieved mysql database list: {databases}")
-            
-            # Update cache
-            self.metadata_cache[cache_key] = databases
-            self.metadata_cache_time[cache_key] = datetime.now()
-            
+            result = _BACKENDS[backend_name].execute(query, params=target_schemas or None)
+            databases = [db["SCHEMA_NAME"] for db in result] if result else []
+            logger.info(f"Retrieved {backend_name} database list: {databases}")
             return databases
-        except Exception as e:
-            logger.error(f"Error getting database list: {str(e)}")
-            return []
+        
+        return self._cached(f"databases_{backend_name}", fetch)
 
     def get_all_target_databases(self) -> List[str]:
         """
@@ -226,66 +467,135 @@ class MetadataExtractor:
             return []
         
         cache_key = f"tables_{db_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
-        
-        try:
+        def fetch():
             # Use information_schema.tables table to get table list
-            query = f"""
+            query = """
             SELECT 
                 TABLE_NAME,TABLE_COMMENT  
             FROM 
                 information_schema.tables 
             WHERE 
-                TABLE_SCHEMA = '{db_name}' 
+                TABLE_SCHEMA = %s 
                 AND TABLE_TYPE = 'BASE TABLE'
             """
-
-
-            if "mysql_catalog_bigdata." in db_name:
-                db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                query2 = f"""
-                SELECT
-                    TABLE_NAME,TABLE_COMMENT 
-                FROM
-                    information_schema.tables
-                WHERE
-                    TABLE_SCHEMA = '{db_name2}'
-                    AND TABLE_TYPE = 'BASE TABLE'
-                """
-                result = execute_query_mysql(query2, db_name2)
-            else:
-                result = execute_query(query, db_name)
+            result = self._exec(db_name, query)
 
             logger.info(f"{db_name}.information_schema.tables query result: {result}")
 
-
-
-            if not result:
-                tables_info = []
-            else:
-                # 构造包含表名和表注释的字典列表
-                tables_info = [{
-                    'table_name': table['TABLE_NAME'],
-                    'table_comment': table['TABLE_COMMENT'] if table['TABLE_COMMENT'] else ''  # 处理可能的None值
-                } for table in result]
-                logger.info(f"Table names retrieved from {db_name}.information_schema.tables: {tables_info}")
-
-            # 如果需要按层次结构排序
-            if self.enable_table_hierarchy and tables_info:
-                # 注意：这里需要调整排序逻辑，因为现在处理的是字典而非单纯的表名
-                tables_info = self._sort_tables_by_hierarchy([table['table_name'] for table in tables_info])
-                # 或者修改 _sort_tables_by_hierarchy 方法以处理字典列表
-            
-            # Update cache
-            self.metadata_cache[cache_key] = tables_info
-            self.metadata_cache_time[cache_key] = datetime.now()
-            
-            return tables_info
+            return self._build_tables_info(db_name, result)
+        
+        try:
+            return self._cached(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error getting table list: {str(e)}")
             return []
     
+    def _build_tables_info(self, db_name: str, rows) -> List[Dict[str, str]]:
+        """
+        Build the table list of a database from information_schema.tables rows
+        
+        Args:
+            db_name: Database name
+            rows: Rows with TABLE_NAME and TABLE_COMMENT keys
+            
+        Returns:
+            List of table names and comments, sorted by hierarchy if enabled
+        """
+        if not rows:
+            tables_info = []
+        else:
+            # 构造包含表名和表注释的字典列表
+            tables_info = [{
+                'table_name': table['TABLE_NAME'],
+                'table_comment': table['TABLE_COMMENT'] if table['TABLE_COMMENT'] else ''  # 处理可能的None值
+            } for table in rows]
+            logger.info(f"Table names retrieved from {db_name}.information_schema.tables: {tables_info}")
+
+        # 如果需要按层次结构排序
+        if self.enable_table_hierarchy and tables_info:
+            # 注意：这里需要调整排序逻辑，因为现在处理的是字典而非单纯的表名
+            tables_info = self._sort_tables_by_hierarchy([table['table_name'] for table in tables_info])
+            # 或者修改 _sort_tables_by_hierarchy 方法以处理字典列表
+        
+        return tables_info
+    
+    @staticmethod
+    def _run_per_backend(fetch: Callable[[Callable, Dict[str, str]], None], db_names: List[str]) -> None:
+        """
+        Call fetch once per backend serving some of the databases, concurrently
+        
+        Args:
+            fetch: Called as fetch(backend, dbs_by_schema) with the backend's query functions
+                (a _BACKENDS entry) and a mapping of the schema names as seen by that backend
+                to the database names (mysql_catalog_bigdata. prefix stripped)
+            db_names: Database names
+        """
+        dbs_by_backend = {}
+        for db_name in db_names:
+            backend, schema_name = _resolve_database(db_name)
+            dbs_by_backend.setdefault(backend, {})[schema_name] = db_name
+        
+        backends = list(dbs_by_backend.items())
+        if len(backends) == 1:
+            fetch(*backends[0])
+        elif backends:
+            # The Doris and MySQL queries do not depend on each other, run them concurrently
+            with ThreadPoolExecutor(max_workers=min(METADATA_FETCH_CONCURRENCY, len(backends))) as executor:
+                list(executor.map(lambda backend: fetch(*backend), backends))
+    
+    def get_all_tables_bulk(self, db_names: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Get the table lists of several databases with one query per backend
+        
+        Doris databases and mysql_catalog_bigdata. databases are each read with a single
+        TABLE_SCHEMA IN (...) query. Each table list is cached under the get_database_tables key.
+        
+        Args:
+            db_names: Database names
+            
+        Returns:
+            Mapping from database name to its table list (see get_database_tables)
+        """
+        all_tables = {}
+        missing = []
+        for db_name in dict.fromkeys(db_names):
+            cached = self._cache_get(f"tables_{db_name}", _MISSING)
+            if cached is not _MISSING:
+                all_tables[db_name] = cached
+            else:
+                missing.append(db_name)
+        
+        def fetch(backend, dbs_by_schema):
+            placeholders = _in_placeholders(len(dbs_by_schema))
+            query = f"""
+            SELECT 
+                TABLE_SCHEMA,TABLE_NAME,TABLE_COMMENT  
+            FROM 
+                information_schema.tables 
+            WHERE 
+                TABLE_SCHEMA IN ({placeholders}) 
+                AND TABLE_TYPE = 'BASE TABLE'
+            """
+            rows_by_schema = defaultdict(list)
+            for row in backend.execute(query, params=tuple(dbs_by_schema)) or []:
+                rows_by_schema[row["TABLE_SCHEMA"]].append(row)
+            
+            for schema_name, db_name in dbs_by_schema.items():
+                tables_info = self._build_tables_info(db_name, rows_by_schema.get(schema_name))
+                self._cache_set(f"tables_{db_name}", tables_info)
+                all_tables[db_name] = tables_info
+        
+        if missing:
+            try:
+                self._run_per_backend(fetch, missing)
+            except Exception as e:
+                logger.warning(f"Bulk table list query failed, falling back to one query per database: {str(e)}")
+                for db_name in db_names:
+                    if db_name not in all_tables:
+                        all_tables[db_name] = self.get_database_tables(db_name)
+        
+        return all_tables
+    
     def get_all_tables_and_columns(self) -> Dict[str, Any]:
         """
         Get information for all tables and columns
@@ -294,38 +604,160 @@ class MetadataExtractor:
             Dict[str, Any]: Dictionary containing information for all tables and columns
         """
         cache_key = f"all_tables_columns_{self.db_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
+        def fetch():
+            return self._summarize_schemas(self._bulk_fetch_schemas([self.db_name]).get(self.db_name, {}))
         
         try:
-            result = {}
-            tables = self.get_database_tables(self.db_name)
-
-            for table_info in tables:
-                table_name = table_info['table_name']
-                schema = self.get_table_schema(table_name, self.db_name)
-                if schema:
-                    columns = schema.get("columns", [])
-                    column_names = [col.get("name") for col in columns if col.get("name")]
-                    column_types = {col.get("name"): col.get("type") for col in columns if col.get("name") and col.get("type")}
-                    column_comments = {col.get("name"): col.get("comment") for col in columns if col.get("name")}
-                    
-                    result[table_name] = {
-                        "comment": schema.get("comment", ""),
-                        "columns": column_names,
-                        "column_types": column_types,
-                        "column_comments": column_comments
-                    }
-            
-            # Update cache
-            self.metadata_cache[cache_key] = result
-            self.metadata_cache_time[cache_key] = datetime.now()
-            
-            return result
+            return self._cached(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error getting all tables and columns information: {str(e)}")
             return {}
     
+    def get_all_tables_and_columns_from_all_databases(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get information for all tables and columns of all target databases
+        
+        The columns and tables of all databases served by one backend are read with a single
+        query each.
+        
+        Returns:
+            Mapping from database name to its tables and columns (see get_all_tables_and_columns)
+        """
+        target_dbs = self.get_all_target_databases()
+        all_tables = {}
+        missing = []
+        for db_name in target_dbs:
+            cached = self._cache_get(f"all_tables_columns_{db_name}", _MISSING)
+            if cached is not _MISSING:
+                all_tables[db_name] = cached
+            else:
+                missing.append(db_name)
+        
+        if missing:
+            try:
+                schemas_by_db = self._bulk_fetch_schemas(missing)
+                for db_name in missing:
+                    all_tables[db_name] = self._summarize_schemas(schemas_by_db.get(db_name, {}))
+                    self._cache_set(f"all_tables_columns_{db_name}", all_tables[db_name])
+            except Exception as e:
+                logger.error(f"Error getting all tables and columns information: {str(e)}")
+        
+        # Keep the target database order and drop databases without tables
+        return {db_name: all_tables[db_name] for db_name in target_dbs if all_tables.get(db_name)}
+    
+    @staticmethod
+    def _summarize_schemas(schemas: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Reduce the table schemas of a database to the get_all_tables_and_columns format, base tables only"""
+        result = {}
+        for table_name, schema in schemas.items():
+            if schema.get("table_type") != "BASE TABLE":
+                continue
+            names, types, comments = [], {}, {}
+            for col in schema["columns"]:
+                name = col["name"]
+                if not name:
+                    continue
+                names.append(name)
+                if col["type"]:
+                    types[name] = col["type"]
+                comments[name] = col["comment"]
+            result[table_name] = {
+                "comment": schema["comment"],
+                "columns": names,
+                "column_types": types,
+                "column_comments": comments
+            }
+        return result
+    
+    def _bulk_fetch_schemas(self, db_names: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get the schema of every table of several databases with one columns query and one
+        tables query per backend
+        
+        The schema, table comment and column comments of each table are cached under the keys
+        used by get_table_schema, get_table_comment and get_column_comments.
+        
+        Args:
+            db_names: Database names
+            
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: Mapping of database name to a mapping of
+            table name to its schema (see get_table_schema)
+        """
+        schemas_by_db = {}
+        
+        def fetch(backend, dbs_by_schema):
+            placeholders = _in_placeholders(len(dbs_by_schema))
+            columns_query = f"""
+            SELECT 
+                TABLE_SCHEMA,
+                TABLE_NAME,
+                COLUMN_NAME, 
+                DATA_TYPE, 
+                IS_NULLABLE, 
+                COLUMN_DEFAULT, 
+                COLUMN_COMMENT,
+                ORDINAL_POSITION,
+                COLUMN_KEY,
+                EXTRA
+            FROM 
+                information_schema.columns 
+            WHERE 
+                TABLE_SCHEMA IN ({placeholders})
+            ORDER BY 
+                TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+            """
+            tables_query = f"""
+            SELECT 
+                TABLE_SCHEMA,
+                TABLE_NAME,
+                TABLE_COMMENT,
+                TABLE_TYPE,
+                ENGINE 
+            FROM 
+                information_schema.tables 
+            WHERE 
+                TABLE_SCHEMA IN ({placeholders})
+            """
+            params = tuple(dbs_by_schema)
+            table_rows = {
+                (row["TABLE_SCHEMA"], row["TABLE_NAME"]): row
+                for row in backend.execute(tables_query, params=params) or []
+            }
+            
+            # The column rows arrive ordered by table, so they are streamed and grouped on the fly
+            # and only one table's rows are held at a time
+            now = datetime.now()
+            fetched_schemas = []
+            with closing(backend.stream(columns_query, params=params)) as column_rows:
+                for (schema_name, table_name), rows in groupby(column_rows, key=lambda row: (row["TABLE_SCHEMA"], row["TABLE_NAME"])):
+                    table_row = table_rows.get((schema_name, table_name))
+                    if table_row is None:
+                        continue
+                    db_name = dbs_by_schema[schema_name]
+                    columns = self._build_columns(rows)
+                    comment = table_row.get("TABLE_COMMENT", "") or ""
+                    schema = {
+                        "name": table_name,
+                        "database": db_name,
+                        "comment": comment,
+                        "columns": columns,
+                        "create_time": now.isoformat(),
+                        "table_type": table_row.get("TABLE_TYPE", ""),
+                        "engine": table_row.get("ENGINE", "")
+                    }
+                    schemas_by_db.setdefault(db_name, {})[table_name] = schema
+                    fetched_schemas.append(schema)
+                    
+                    # Update cache
+                    self._cache_set(f"schema_{db_name}_{table_name}", schema)
+                    self._cache_comments(schema)
+            
+            self._store_schemas(fetched_schemas)
+        
+        self._run_per_backend(fetch, list(dict.fromkeys(db_names)))
+        return schemas_by_db
+    
     def _sort_tables_by_hierarchy(self, tables: List[str]) -> List[str]:
         """
         Sort tables based on hierarchy matching patterns
@@ -336,33 +768,26 @@ class MetadataExtractor:
         Returns:
             Sorted list of table names
         """
-        if not self.enable_table_hierarchy or not self.table_hierarchy_patterns:
+        if not self.enable_table_hierarchy or not self._compiled_hierarchy_patterns:
             return tables
         
-        # Group tables by pattern priority
-        table_groups = []
-        remaining_tables = set(tables)
-        
-        for pattern in self.table_hierarchy_patterns:
-            matching_tables = []
-            regex = re.compile(pattern)
-            
-            for table in list(remaining_tables):
+        # Bucket each table under the first pattern it matches, unmatched tables go last
+        patterns = self._compiled_hierarchy_patterns
+        buckets = [[] for _ in range(len(patterns) + 1)]
+        for table in tables:
+            for bucket, regex in zip(buckets, patterns):
                 if regex.match(table):
-                    matching_tables.append(table)
-                    remaining_tables.remove(table)
-            
-            if matching_tables:
-                # Within each group, sort alphabetically
-                matching_tables.sort()
-                table_groups.append(matching_tables)
+                    bucket.append(table)
+                    break
+            else:
+                buckets[-1].append(table)
         
-        # Add remaining tables to the end
-        if remaining_tables:
-            table_groups.append(sorted(list(remaining_tables)))
+        # Within each group, sort alphabetically
+        for bucket in buckets:
+            bucket.sort()
         
         # Flatten the groups
-        return [table for group in table_groups for table in group]
+        return list(chain.from_iterable(buckets))
     
     def get_all_tables_from_all_databases(self) -> Dict[str, List[str]]:
         """
@@ -371,15 +796,10 @@ class MetadataExtractor:
         Returns:
             Mapping from database name to list of table names
         """
-        all_tables = {}
         target_dbs = self.get_all_target_databases()
-        
-        for db_name in target_dbs:
-            tables = self.get_database_tables(db_name)
-            if tables:
-                all_tables[db_name] = tables
-        
-        return all_tables
+        all_tables = self.get_all_tables_bulk(target_dbs)
+        # Keep the target database order and drop databases without tables
+        return {db_name: all_tables[db_name] for db_name in target_dbs if all_tables.get(db_name)}
     
     def find_tables_by_pattern(self, pattern: str, db_name: Optional[str] = None) -> List[Tuple[str, str]]:
         """
@@ -393,7 +813,7 @@ class MetadataExtractor:
             List of matching (database_name, table_name) tuples
         """
         try:
-            regex = re.compile(pattern)
+            regex = _compile_table_pattern(pattern)
         except re.error:
             logger.error(f"Invalid regular expression pattern: {pattern}")
             return []
@@ -431,130 +851,98 @@ class MetadataExtractor:
             return {}
         
         cache_key = f"schema_{db_name}_{table_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
-        
-        try:
-            # Use information_schema.columns table to get table schema
-            query = f"""
+        def fetch():
+            schema = self._load_stored_schemas([table_name], db_name).get(table_name)
+            if schema is not None:
+                self._cache_comments(schema)
+                return schema
+            
+            # Get the columns together with the table comment, type and engine in one query
+            query = """
             SELECT 
-                COLUMN_NAME, 
-                DATA_TYPE, 
-                IS_NULLABLE, 
-                COLUMN_DEFAULT, 
-                COLUMN_COMMENT,
-                ORDINAL_POSITION,
-                COLUMN_KEY,
-                EXTRA
+                c.COLUMN_NAME, 
+                c.DATA_TYPE, 
+                c.IS_NULLABLE, 
+                c.COLUMN_DEFAULT, 
+                c.COLUMN_COMMENT,
+                c.ORDINAL_POSITION,
+                c.COLUMN_KEY,
+                c.EXTRA,
+                t.TABLE_COMMENT,
+                t.TABLE_TYPE,
+                t.ENGINE
             FROM 
-                information_schema.columns 
+                information_schema.columns c
+                JOIN information_schema.tables t
+                    ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
             WHERE 
-                TABLE_SCHEMA = '{db_name}' 
-                AND TABLE_NAME = '{table_name}'
+                c.TABLE_SCHEMA = %s 
+                AND c.TABLE_NAME = %s
             ORDER BY 
-                ORDINAL_POSITION
+                c.ORDINAL_POSITION
             """
-
-            if "mysql_catalog_bigdata." in db_name:
-                db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                query2 = f"""
-                SELECT
-                    COLUMN_NAME,
-                    DATA_TYPE,
-                    IS_NULLABLE,
-                    COLUMN_DEFAULT,
-                    COLUMN_COMMENT,
-                    ORDINAL_POSITION,
-                    COLUMN_KEY,
-                    EXTRA
-                FROM
-                    information_schema.columns
-                WHERE
-                    TABLE_SCHEMA = '{db_name2}'
-                    AND TABLE_NAME = '{table_name}'
-                ORDER BY
-                   ORDINAL_POSITION
-                """
-                result = execute_query_mysql(query2)
-            else:
-                result = execute_query(query)
-
-
+            result = self._exec(db_name, query, table_name)
 
             if not result:
                 logger.warning(f"Table {db_name}.{table_name} does not exist or has no columns")
                 return {}
 
             # Create structured table schema information
-            columns = []
-            for col in result:
-                # Ensure using actual column values, not column names
-                column_info = {
-                    "name": col.get("COLUMN_NAME", ""),
-                    "type": col.get("DATA_TYPE", ""),
-                    "nullable": col.get("IS_NULLABLE", "") == "YES",
-                    "default": col.get("COLUMN_DEFAULT", ""),
-                    "comment": col.get("COLUMN_COMMENT", "") or "",
-                    "position": col.get("ORDINAL_POSITION", ""),
-                    "key": col.get("COLUMN_KEY", "") or "",
-                    "extra": col.get("EXTRA", "") or ""
-                }
-                columns.append(column_info)
-
-            # Get table comment
-            table_comment = self.get_table_comment(table_name, db_name)
+            columns = self._build_columns(result)
+            table_row = result[0]
+            table_comment = table_row.get("TABLE_COMMENT", "") or ""
             
             # Build complete structure
+            now = datetime.now()
             schema = {
                 "name": table_name,
                 "database": db_name,
                 "comment": table_comment,
                 "columns": columns,
-                "create_time": datetime.now().isoformat()
+                "create_time": now.isoformat(),
+                "table_type": table_row.get("TABLE_TYPE", ""),
+                "engine": table_row.get("ENGINE", "")
             }
             
-            # Get table type information
-            try:
-                table_type_query = f"""
-                SELECT 
-                    TABLE_TYPE,
-                    ENGINE 
-                FROM 
-                    information_schema.tables 
-                WHERE 
-                    TABLE_SCHEMA = '{db_name}' 
-                    AND TABLE_NAME = '{table_name}'
-                """
-                if "mysql_catalog_bigdata." in db_name:
-                    db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                    table_type_query2 = f"""
-                    SELECT
-                        TABLE_TYPE,
-                        ENGINE
-                    FROM
-                        information_schema.tables
-                    WHERE
-                        TABLE_SCHEMA = '{db_name2}'
-                        AND TABLE_NAME = '{table_name}'
-                    """
-                    table_type_result = execute_query_df_mysql(table_type_query2)
-                else:
-                    table_type_result = execute_query(table_type_query)
-                if table_type_result:
-                    schema["table_type"] = table_type_result[0].get("TABLE_TYPE", "")
-                    schema["engine"] = table_type_result[0].get("ENGINE", "")
-            except Exception as e:
-                logger.warning(f"Error getting table type information: {str(e)}")
-            
-            # Update cache
-            self.metadata_cache[cache_key] = schema
-            self.metadata_cache_time[cache_key] = datetime.now()
+            # The comment getters read the same rows, cache their results too
+            self._cache_comments(schema)
+            self._store_schemas([schema])
             
             return schema
+        
+        try:
+            # A missing table is not cached, it may be created later
+            return self._cached(cache_key, fetch, cache_empty=False)
         except Exception as e:
             logger.error(f"Error getting table schema: {str(e)}")
             return {}
     
+    def _cache_comments(self, schema: Dict[str, Any]) -> None:
+        """Cache the table comment and column comments of a schema under the comment getters' keys"""
+        table_name = schema["name"]
+        db_name = schema["database"]
+        self._cache_set(f"table_comment_{db_name}_{table_name}", schema["comment"])
+        self._cache_set(f"column_comments_{db_name}_{table_name}", {col["name"]: col["comment"] for col in schema["columns"] if col["name"]})
+    
+    def _load_stored_schemas(self, table_names: List[str], db_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get table schemas from the persistent store, if they were stored less than METADATA_CACHE_STORE_TTL seconds ago
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of table name to its stored schema, expired or missing tables are left out
+        """
+        if self._store is None:
+            return {}
+        keys = {f"schema_{db_name}_{table_name}": table_name for table_name in table_names}
+        stored = self._store.get_many(list(keys), METADATA_CACHE_STORE_TTL)
+        return {keys[key]: schema for key, schema in stored.items()}
+    
+    def _store_schemas(self, schemas: List[Dict[str, Any]]) -> None:
+        """Persist table schemas"""
+        if self._store is None:
+            return
+        self._store.set_many((f"schema_{schema['database']}_{schema['name']}", schema) for schema in schemas)
+    
     def get_table_comment(self, table_name: str, db_name: Optional[str] = None) -> str:
         """
         Get the comment for a table
@@ -572,45 +960,28 @@ class MetadataExtractor:
             return ""
         
         cache_key = f"table_comment_{db_name}_{table_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
-        
-        try:
+        def fetch():
             # Use information_schema.tables table to get table comment
-            query = f"""
+            query = """
             SELECT 
                 TABLE_COMMENT 
             FROM 
                 information_schema.tables 
             WHERE 
-                TABLE_SCHEMA = '{db_name}' 
-                AND TABLE_NAME = '{table_name}'
+                TABLE_SCHEMA = %s 
+                AND TABLE_NAME = %s
             """
-            if "mysql_catalog_bigdata." in db_name:
-                db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                query2 = f"""
-                SELECT
-                    TABLE_COMMENT
-                FROM
-                    information_schema.tables
-                WHERE
-                    TABLE_SCHEMA = '{db_name2}'
-                    AND TABLE_NAME = '{table_name}'
-                """
-                result = execute_query_mysql(query2)
-            else:
-                result = execute_query(query)
+            result = self._exec(db_name, query, table_name)
 
             if not result or not result[0]:
                 comment = ""
             else:
                 comment = result[0].get("TABLE_COMMENT", "")
             
-            # Update cache
-            self.metadata_cache[cache_key] = comment
-            self.metadata_cache_time[cache_key] = datetime.now()
-            
             return comment
+        
+        try:
+            return self._cached(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error getting table comment: {str(e)}")
             return ""
@@ -632,40 +1003,21 @@ class MetadataExtractor:
             return {}
         
         cache_key = f"column_comments_{db_name}_{table_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
-        
-        try:
+        def fetch():
             # Use information_schema.columns table to get column comments
-            query = f"""
+            query = """
             SELECT 
                 COLUMN_NAME, 
                 COLUMN_COMMENT 
             FROM 
                 information_schema.columns 
             WHERE 
-                TABLE_SCHEMA = '{db_name}' 
-                AND TABLE_NAME = '{table_name}'
+                TABLE_SCHEMA = %s 
+                AND TABLE_NAME = %s
             ORDER BY 
                 ORDINAL_POSITION
             """
-            if "mysql_catalog_bigdata." in db_name:
-                db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                query2 = f"""
-                SELECT
-                    COLUMN_NAME,
-                    COLUMN_COMMENT
-                FROM
-                    information_schema.columns
-                WHERE
-                    TABLE_SCHEMA = '{db_name2}'
-                    AND TABLE_NAME = '{table_name}'
-                ORDER BY
-                    ORDINAL_POSITION
-                """
-                result = execute_query_mysql(query2)
-            else:
-                result = execute_query(query)
+            result = self._exec(db_name, query, table_name)
 
             comments = {}
             for col in result:
@@ -674,11 +1026,10 @@ class MetadataExtractor:
                 if column_name:
                     comments[column_name] = column_comment
             
-            # Update cache
-            self.metadata_cache[cache_key] = comments
-            self.metadata_cache_time[cache_key] = datetime.now()
-            
             return comments
+        
+        try:
+            return self._cached(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error getting column comments: {str(e)}")
             return {}
@@ -700,50 +1051,266 @@ class MetadataExtractor:
             return []
         
         cache_key = f"indexes_{db_name}_{table_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
+        def fetch():
+            backend, schema_name = _resolve_database(db_name)
+            rows = backend.execute(_show_index_sql(schema_name, table_name))
+            
+            # Process results
+            indexes = self._group_indexes(rows)
+            
+            return indexes
         
         try:
-            query = f"SHOW INDEX FROM `{db_name}`.`{table_name}`"
-            if "mysql_catalog_bigdata." in db_name:
-                db_name2 = db_name.removeprefix("mysql_catalog_bigdata.")
-                query2 = f"SHOW INDEX FROM `{db_name2}`.`{table_name}`"
-                df = execute_query_df_mysql(query2)
-            else:
-                df = execute_query_df(query)
+            return self._cached(cache_key, fetch)
+        except Exception as e:
+            logger.error(f"Error getting index information: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _build_columns(rows) -> List[Dict[str, Any]]:
+        """
+        Build column information from information_schema.columns rows
+        
+        Args:
+            rows: Rows with all the COLUMN_NAME, DATA_TYPE, IS_NULLABLE, ... keys read by _COLUMN_FIELDS
             
-            # Process results
-            indexes = []
-            current_index = None
+        Returns:
+            List[Dict[str, Any]]: Column information ordered as the rows
+        """
+        # One C-level lookup of all eight fields per row, unpacked into locals
+        return [
+            {
+                "name": name,
+                "type": data_type,
+                "nullable": nullable == "YES",
+                "default": default,
+                "comment": comment or "",
+                "position": position,
+                "key": key or "",
+                "extra": extra or ""
+            }
+            for name, data_type, nullable, default, comment, position, key, extra in map(_COLUMN_FIELDS, rows)
+        ]
+    
+    @staticmethod
+    def _group_indexes(rows) -> List[Dict[str, Any]]:
+        """
+        Group SHOW INDEX rows into one entry per index
+        
+        Args:
+            rows: SHOW INDEX rows with Key_name, Column_name, Non_unique and Index_type keys
             
-            for _, row in df.iterrows():
-                index_name = row['Key_name']
-                column_name = row['Column_name']
-                
-                if current_index is None or current_index['name'] != index_name:
-                    if current_index is not None:
-                        indexes.append(current_index)
-                    
-                    current_index = {
-                        'name': index_name,
-                        'columns': [column_name],
-                        'unique': row['Non_unique'] == 0,
-                        'type': row['Index_type']
-                    }
-                else:
-                    current_index['columns'].append(column_name)
+        Returns:
+            List[Dict[str, Any]]: List of index information
+        """
+        indexes = []
+        current_index = None
+        
+        for row in rows:
+            index_name = row['Key_name']
+            column_name = row['Column_name']
             
-            if current_index is not None:
-                indexes.append(current_index)
+            if current_index is None or current_index['name'] != index_name:
+                if current_index is not None:
+                    indexes.append(current_index)
+                
+                current_index = {
+                    'name': index_name,
+                    'columns': [column_name],
+                    'unique': row['Non_unique'] == 0,
+                    'type': row['Index_type']
+                }
+            else:
+                current_index['columns'].append(column_name)
+        
+        if current_index is not None:
+            indexes.append(current_index)
+        return indexes
+    
+    @staticmethod
+    def _bundle_cache_keys(table_name: str, db_name: str) -> Dict[str, str]:
+        """Cache keys of the parts of a table bundle, shared with the individual getters"""
+        return {
+            "schema": f"schema_{db_name}_{table_name}",
+            "comment": f"table_comment_{db_name}_{table_name}",
+            "column_comments": f"column_comments_{db_name}_{table_name}",
+            "indexes": f"indexes_{db_name}_{table_name}"
+        }
+    
+    def _get_cached_bundle(self, table_name: str, db_name: str) -> Optional[Dict[str, Any]]:
+        """Return the cached bundle of a table, or None if any part is missing or expired"""
+        bundle = {}
+        for part, key in self._bundle_cache_keys(table_name, db_name).items():
+            value = self._cache_get(key, _MISSING)
+            if value is _MISSING:
+                return None
+            bundle[part] = value
+        return bundle
+    
+    @staticmethod
+    def _bundle_queries(schema_name: str, table_name: str) -> Tuple[List[str], Tuple[str, ...]]:
+        """Columns, table and index queries of a table bundle (in the order _build_bundle expects) and their parameters"""
+        # The statements are sent with parameters, so the % of the quoted SHOW INDEX identifiers is escaped
+        show_index_sql = _show_index_sql(schema_name, table_name).replace("%", "%%")
+        queries = [
+            """
+            SELECT 
+                COLUMN_NAME, 
+                DATA_TYPE, 
+                IS_NULLABLE, 
+                COLUMN_DEFAULT, 
+                COLUMN_COMMENT,
+                ORDINAL_POSITION,
+                COLUMN_KEY,
+                EXTRA
+            FROM 
+                information_schema.columns 
+            WHERE 
+                TABLE_SCHEMA = %s 
+                AND TABLE_NAME = %s
+            ORDER BY 
+                ORDINAL_POSITION
+            """,
+            """
+            SELECT 
+                TABLE_COMMENT,
+                TABLE_TYPE,
+                ENGINE 
+            FROM 
+                information_schema.tables 
+            WHERE 
+                TABLE_SCHEMA = %s 
+                AND TABLE_NAME = %s
+            """,
+            show_index_sql
+        ]
+        return queries, (schema_name, table_name, schema_name, table_name)
+    
+    def _build_bundle(self, table_name: str, db_name: str, column_rows, table_rows, index_rows) -> Dict[str, Any]:
+        """
+        Build a table bundle from the results of _bundle_queries and cache its parts
+        
+        Returns:
+            Dict[str, Any]: {"schema": ..., "comment": ..., "column_comments": ..., "indexes": ...}
+        """
+        now = datetime.now()
+        table_row = table_rows[0] if table_rows else {}
+        comment = table_row.get("TABLE_COMMENT", "") or ""
+        columns = self._build_columns(column_rows)
+        column_comments = {col["name"]: col["comment"] for col in columns if col["name"]}
+        indexes = self._group_indexes(index_rows)
+        
+        if columns:
+            schema = {
+                "name": table_name,
+                "database": db_name,
+                "comment": comment,
+                "columns": columns,
+                "create_time": now.isoformat()
+            }
+            if table_row:
+                schema["table_type"] = table_row.get("TABLE_TYPE", "")
+                schema["engine"] = table_row.get("ENGINE", "")
+        else:
+            logger.warning(f"Table {db_name}.{table_name} does not exist or has no columns")
+            schema = {}
+        
+        bundle = {
+            "schema": schema,
+            "comment": comment,
+            "column_comments": column_comments,
+            "indexes": indexes
+        }
+        
+        # Update cache, a missing table is not cached (same as get_table_schema)
+        if schema:
+            for part, key in self._bundle_cache_keys(table_name, db_name).items():
+                self._cache_set(key, bundle[part])
+        
+        return bundle
+    
+    def get_table_bundle(self, table_name: str, db_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get schema, table comment, column comments and indexes of a table in one round-trip
+        
+        The individual results are cached under the same keys used by get_table_schema,
+        get_table_comment, get_column_comments and get_table_indexes.
+        
+        Args:
+            table_name: Table name
+            db_name: Database name, uses current database if None
             
-            # Update cache
-            self.metadata_cache[cache_key] = indexes
-            self.metadata_cache_time[cache_key] = datetime.now()
+        Returns:
+            Dict[str, Any]: {"schema": ..., "comment": ..., "column_comments": ..., "indexes": ...},
+            schema is empty if the table does not exist
+        """
+        db_name = db_name or self.db_name
+        if not db_name:
+            logger.warning("Database name not specified")
+            return {}
+        return self.get_table_bundles([table_name], db_name).get(table_name, {})
+    
+    def get_table_bundles(self, table_names: List[str], db_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the bundles of several tables of one database in a single multi-statement round-trip
+        
+        Args:
+            table_names: Table names
+            db_name: Database name, uses current database if None
             
-            return indexes
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of table name to its bundle (see get_table_bundle)
+        """
+        db_name = db_name or self.db_name
+        if not db_name:
+            logger.warning("Database name not specified")
+            return {}
+        
+        bundles = {}
+        missing = []
+        for table_name in dict.fromkeys(table_names):
+            cached = self._get_cached_bundle(table_name, db_name)
+            if cached is not None:
+                bundles[table_name] = cached
+            else:
+                missing.append(table_name)
+        if not missing:
+            return bundles
+        
+        backend, schema_name = _resolve_database(db_name)
+        
+        queries = []
+        params = []
+        for table_name in missing:
+            table_queries, table_params = self._bundle_queries(schema_name, table_name)
+            queries.extend(table_queries)
+            params.extend(table_params)
+        
+        try:
+            results = backend.execute_multi(queries, params=params)
         except Exception as e:
-            logger.error(f"Error getting index information: {str(e)}")
-            return []
+            # e.g. server without multi-statement support or missing table, use the individual queries
+            logger.warning(f"Batched metadata query for {db_name} tables {missing} failed, falling back to individual queries: {str(e)}")
+            # Check the stored schemas of all tables at once so get_table_schema finds them cached
+            try:
+                for schema in self._load_stored_schemas(missing, db_name).values():
+                    self._cache_set(f"schema_{db_name}_{schema['name']}", schema)
+                    self._cache_comments(schema)
+            except Exception as e:
+                logger.warning(f"Error loading stored schemas of {db_name} tables {missing}: {str(e)}")
+            for table_name in missing:
+                bundles[table_name] = {
+                    "schema": self.get_table_schema(table_name, db_name),
+                    "comment": self.get_table_comment(table_name, db_name),
+                    "column_comments": self.get_column_comments(table_name, db_name),
+                    "indexes": self.get_table_indexes(table_name, db_name)
+                }
+            return bundles
+        
+        for i, table_name in enumerate(missing):
+            column_rows, table_rows, index_rows = results[3 * i:3 * i + 3]
+            bundles[table_name] = self._build_bundle(table_name, db_name, column_rows, table_rows, index_rows)
+        return bundles
     
     def get_table_relationships(self) -> List[Dict[str, Any]]:
         """
@@ -753,89 +1320,129 @@ class MetadataExtractor:
             List[Dict[str, Any]]: List of table relationship information
         """
         cache_key = f"relationships_{self.db_name}"
-        if cache_key in self.metadata_cache and (datetime.now() - self.metadata_cache_time.get(cache_key, datetime.min)).total_seconds() < self.cache_ttl:
-            return self.metadata_cache[cache_key]
-        
-        try:
-            # Get all tables
-            tables = self.get_database_tables(self.db_name)
+        def fetch():
+            # Columns of all base tables, read with one bulk query
+            schemas = self._bulk_fetch_schemas([self.db_name]).get(self.db_name, {})
+            columns_by_table = {
+                table_name: [col["name"] for col in schema["columns"] if col["name"]]
+                for table_name, schema in schemas.items()
+                if schema.get("table_type") == "BASE TABLE"
+            }
+            # Tables with a column named id, the assumed primary key
+            tables_with_id = {table_name for table_name, columns in columns_by_table.items() if "id" in columns}
             relationships = []
             
             # Simple foreign key naming convention detection
             # Example: If a table has a column named xxx_id and another table named xxx exists, it might be a foreign key relationship
-            for table_info in tables:
-                table_name = table_info['table_name']
-                schema = self.get_table_schema(table_name, self.db_name)
-                columns = schema.get("columns", [])
-                
-                for column in columns:
-                    column_name = column["name"]
-                    if column_name.endswith('_id'):
-                        # Possible foreign key table name
-                        ref_table_name = column_name[:-3]  # Remove _id suffix
-                        
-                        # Check if the possible table exists
-                        for ref_table_info in tables:
-                            ref_table_name = ref_table_info['table_name']
-                            # Find possible primary key column
-                            ref_schema = self.get_table_schema(ref_table_name, self.db_name)
-                            ref_columns = ref_schema.get("columns", [])
-                            
-                            # Assume primary key column name is id
-                            if any(col["name"] == "id" for col in ref_columns):
-                                relationships.append({
-                                    "table": table_name,
-                                    "column": column_name,
-                                    "references_table": ref_table_name,
-                                    "references_column": "id",
-                                    "relationship_type": "many-to-one",
-                                    "confidence": "medium"  # Low confidence, based on naming convention
-                                })
-            
-            # Update cache
-            self.metadata_cache[cache_key] = relationships
-            self.metadata_cache_time[cache_key] = datetime.now()
+            for table_name, columns in columns_by_table.items():
+                for column_name in columns:
+                    # Possible foreign key table name, with the _id suffix removed
+                    if column_name.endswith('_id') and column_name[:-3] in tables_with_id:
+                        relationships.append({
+                            "table": table_name,
+                            "column": column_name,
+                            "references_table": column_name[:-3],
+                            "references_column": "id",
+                            "relationship_type": "many-to-one",
+                            "confidence": "medium"  # Low confidence, based on naming convention
+                        })
             
             return relationships
+        
+        try:
+            return self._cached(cache_key, fetch)
         except Exception as e:
             logger.error(f"Error inferring table relationships: {str(e)}")
             return []
     
-    def get_recent_audit_logs(self, days: int = 7, limit: int = 100) -> pd.DataFrame:
+    # Recent audit log query, days and limit are bound as parameters (% in LIKE patterns escaped as %%)
+    # so Doris prunes on `time` and stops after `limit` rows
+    _AUDIT_LOG_QUERY = """
+            SELECT client_ip, user, db, time, stmt_id, stmt, state, error_code
+            FROM `__internal_schema`.`audit_log`
+            WHERE `time` >= DATE_SUB(NOW(), INTERVAL %s DAY)
+            AND state = 'EOF' AND error_code = 0
+            AND `stmt` NOT LIKE 'SHOW%%'
+            AND `stmt` NOT LIKE 'DESC%%'
+            AND `stmt` NOT LIKE 'EXPLAIN%%'
+            AND `stmt` NOT LIKE 'SELECT 1%%'
+            ORDER BY time DESC
+            LIMIT %s
+            """
+    
+    def get_recent_audit_log_records(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        Get recent audit logs
+        Get recent audit logs as plain row dictionaries
+        
+        Skips DataFrame construction, for callers that only serialize the rows.
         
         Args:
             days: Get audit logs for the last N days
             limit: Maximum number of records to return
             
         Returns:
-            pd.DataFrame: Audit log DataFrame
+            List[Dict[str, Any]]: Audit log rows
         """
         try:
-            start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-            
-            query = f"""
-            SELECT client_ip, user, db, time, stmt_id, stmt, state, error_code
+            return list(execute_query(self._AUDIT_LOG_QUERY, params=(int(days), int(limit))))
+        except Exception as e:
+            logger.error(f"Error getting audit logs: {str(e)}")
+            return []
+    
+    # Distinct recent statements and how often each ran, for SQL pattern extraction. Session
+    # and transaction statements are dropped and long statements truncated on the server, so
+    # neither noise nor duplicate or oversized statement text is transferred
+    _AUDIT_LOG_STATEMENTS_QUERY = """
+            SELECT SUBSTRING(`stmt`, 1, %s) AS stmt, COUNT(*) AS frequency
             FROM `__internal_schema`.`audit_log`
-            WHERE `time` >= '{start_date}'
+            WHERE `time` >= DATE_SUB(NOW(), INTERVAL %s DAY)
             AND state = 'EOF' AND error_code = 0
-            AND `stmt` NOT LIKE 'SHOW%'
-            AND `stmt` NOT LIKE 'DESC%'
-            AND `stmt` NOT LIKE 'EXPLAIN%'
-            AND `stmt` NOT LIKE 'SELECT 1%'
-            ORDER BY time DESC
-            LIMIT {limit}
+            AND `stmt` NOT LIKE 'SHOW%%'
+            AND `stmt` NOT LIKE 'DESC%%'
+            AND `stmt` NOT LIKE 'EXPLAIN%%'
+            AND `stmt` NOT LIKE 'SELECT 1%%'
+            AND `stmt` NOT LIKE 'USE %%'
+            AND `stmt` NOT LIKE 'SET %%'
+            AND `stmt` NOT LIKE 'COMMIT%%'
+            AND `stmt` NOT LIKE 'ROLLBACK%%'
+            GROUP BY SUBSTRING(`stmt`, 1, %s)
+            ORDER BY MAX(`time`) DESC
+            LIMIT %s
             """
-            df = execute_query_df(query)
-            return df
+    
+    def get_recent_audit_log_statements(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get the distinct statements of recent audit logs with their execution counts
+        
+        Args:
+            days: Get audit logs for the last N days
+            limit: Maximum number of distinct statements to return, most recently run first
+            
+        Returns:
+            List[Dict[str, Any]]: Rows with stmt (truncated to AUDIT_LOG_STMT_MAX_CHARS) and frequency
+        """
+        try:
+            return list(self.iter_recent_audit_log_statements(days=days, limit=limit))
         except Exception as e:
-            logger.error(f"Error getting audit logs: {str(e)}")
-            return pd.DataFrame()
+            logger.error(f"Error getting audit log statements: {str(e)}")
+            return []
     
-    def extract_sql_comments(self, sql: str) -> str:
+    def iter_recent_audit_log_statements(self, days: int = 7, limit: int = 100) -> Iterator[Dict[str, Any]]:
         """
-        Extract comments from SQL
+        Stream the rows of get_recent_audit_log_statements from the server, a chunk at a time
+        
+        Raises:
+            Exception: Query errors, raised while iterating
+        """
+        params = (AUDIT_LOG_STMT_MAX_CHARS, int(days), AUDIT_LOG_STMT_MAX_CHARS, int(limit))
+        with closing(execute_query_stream(self._AUDIT_LOG_STATEMENTS_QUERY, params=params)) as rows:
+            yield from rows
+    
+    @staticmethod
+    @lru_cache(maxsize=SQL_ANALYSIS_CACHE_SIZE)
+    def extract_sql_comments(sql: str) -> str:
+        """
+        Extract comments from SQL (memoized, audit logs repeat the same statements)
         
         Args:
             sql: SQL query
@@ -844,96 +1451,94 @@ class MetadataExtractor:
             str: Extracted comments
         """
         # Extract single-line comments
-        single_line_comments = re.findall(r'--\s*(.*?)(?:\n|$)', sql)
+        single_line_comments = _RE_LINE_COMMENT_TEXT.findall(sql)
         
         # Extract multi-line comments
-        multi_line_comments = re.findall(r'/\*(.*?)\*/', sql, re.DOTALL)
+        multi_line_comments = _RE_BLOCK_COMMENT_TEXT.findall(sql)
         
         # Merge all comments
         all_comments = single_line_comments + multi_line_comments
         return '\n'.join(comment.strip() for comment in all_comments if comment.strip())
     
+    # Patterns returned when none can be extracted from the audit logs, copied per call
+    _DEFAULT_SQL_PATTERNS = (
+        {
+            "pattern": "SELECT * FROM {table} WHERE {condition}",
+            "type": "SELECT",
+            "frequency": 1,
+            "examples": "[]",
+            "comments": "[]",
+            "tables": "[]"
+        },
+        {
+            "pattern": "SELECT {columns} FROM {table} GROUP BY {group_by} ORDER BY {order_by} LIMIT {limit}",
+            "type": "SELECT",
+            "frequency": 1,
+            "examples": "[]",
+            "comments": "[]",
+            "tables": "[]"
+        }
+    )
+    
     def extract_common_sql_patterns(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Extract common SQL patterns
         
         Args:
-            limit: Maximum number of audit logs to retrieve
+            limit: Maximum number of distinct audit log statements to retrieve
             
         Returns:
             List[Dict[str, Any]]: List of SQL pattern information, including pattern, type, frequency, etc.
         """
         try:
-            # Get audit logs
-            audit_logs = self.get_recent_audit_logs(days=30, limit=limit)
-            if audit_logs.empty:
-                # If audit logs cannot be retrieved, return some default patterns
-                default_patterns = [
-                    {
-                        "pattern": "SELECT * FROM {table} WHERE {condition}",
-                        "type": "SELECT",
-                        "frequency": 1
-                    },
-                    {
-                        "pattern": "SELECT {columns} FROM {table} GROUP BY {group_by} ORDER BY {order_by} LIMIT {limit}",
-                        "type": "SELECT",
-                        "frequency": 1
-                    }
-                ]
-                return default_patterns
-            
             # Group and process by SQL type
             patterns_by_type = {}
-            for _, row in audit_logs.iterrows():
-                sql = row['stmt']
+            # Distinct audit log statements with their execution counts, streamed from the server
+            for row in self.iter_recent_audit_log_statements(days=30, limit=limit):
+                sql = row.get('stmt')
                 if not sql:
                     continue
+                frequency = int(row.get('frequency') or 1)
+                
+                # Simplify SQL, statements differing only in constants share the simplified form
+                simplified_sql = self._simplify_sql(sql)
                 
                 # Determine SQL type
-                sql_type = self._get_sql_type(sql)
+                sql_type = self._get_sql_type(simplified_sql)
                 if not sql_type:
                     continue
                 
-                # Simplify SQL
-                simplified_sql = self._simplify_sql(sql)
-                
-                # Extract involved tables
-                tables = self._extract_tables_from_sql(sql)
-                
-                # Extract SQL comments
-                comments = self.extract_sql_comments(sql)
-                
-                # Initialize if it's a new pattern
-                if sql_type not in patterns_by_type:
-                    patterns_by_type[sql_type] = []
-                    
-                # Check if a similar pattern exists
-                found_similar = False
-                for pattern in patterns_by_type[sql_type]:
-                    if self._are_sqls_similar(simplified_sql, pattern['simplified_sql']):
-                        pattern['count'] += 1
-                        pattern['examples'].append(sql)
+                # Patterns of a type are keyed by their simplified SQL, only the first
+                # SQL_PATTERN_MAX_EXAMPLES examples and comments of each are kept
+                type_patterns = patterns_by_type.setdefault(sql_type, {})
+                pattern = type_patterns.get(simplified_sql)
+                if pattern is not None:
+                    pattern['count'] += frequency
+                    if len(pattern['examples']) < SQL_PATTERN_MAX_EXAMPLES:
+                        pattern['examples'].append(sql[:SQL_PATTERN_EXAMPLE_MAX_CHARS])
+                    if len(pattern['comments']) < SQL_PATTERN_MAX_EXAMPLES:
+                        # Extract SQL comments
+                        comments = self.extract_sql_comments(sql)
                         if comments:
                             pattern['comments'].append(comments)
-                        found_similar = True
-                        break
-                        
-                # If no similar pattern found, add new pattern
-                if not found_similar:
-                    patterns_by_type[sql_type].append({
+                else:
+                    # Extract SQL comments
+                    comments = self.extract_sql_comments(sql)
+                    type_patterns[simplified_sql] = {
                         'simplified_sql': simplified_sql,
-                        'examples': [sql],
+                        'examples': [sql[:SQL_PATTERN_EXAMPLE_MAX_CHARS]],
                         'comments': [comments] if comments else [],
-                        'count': 1,
-                        'tables': tables
-                    })
+                        'count': frequency,
+                        # Extract involved tables
+                        'tables': list(self._extract_tables_from_sql(sql))
+                    }
                     
             # Convert grouped patterns to the required output format
             result_patterns = []
             
             # Sort by frequency and convert format
             for sql_type, type_patterns in patterns_by_type.items():
-                sorted_patterns = sorted(type_patterns, key=lambda x: x['count'], reverse=True)
+                sorted_patterns = sorted(type_patterns.values(), key=lambda x: x['count'], reverse=True)
                 
                 # Extract top 3 patterns and convert to expected format
                 for pattern in sorted_patterns[:3]:
@@ -942,61 +1547,41 @@ class MetadataExtractor:
                         "pattern": pattern['simplified_sql'],
                         "type": sql_type,
                         "frequency": pattern['count'],
-                        "examples": json.dumps(pattern['examples'][:3], ensure_ascii=False),
-                        "comments": json.dumps(pattern['comments'][:3], ensure_ascii=False) if pattern['comments'] else "[]",
-                        "tables": json.dumps(pattern['tables'], ensure_ascii=False)
+                        "examples": json_utils.dumps(pattern['examples']),
+                        "comments": json_utils.dumps(pattern['comments']),
+                        "tables": json_utils.dumps(pattern['tables'])
                     })
             
             # If no patterns found, return default values
             if not result_patterns:
-                default_patterns = [
-                    {
-                        "pattern": "SELECT * FROM {table} WHERE {condition}",
-                        "type": "SELECT",
-                        "frequency": 1,
-                        "examples": "[]",
-                        "comments": "[]",
-                        "tables": "[]"
-                    },
-                    {
-                        "pattern": "SELECT {columns} FROM {table} GROUP BY {group_by} ORDER BY {order_by} LIMIT {limit}",
-                        "type": "SELECT",
-                        "frequency": 1,
-                        "examples": "[]",
-                        "comments": "[]",
-                        "tables": "[]"
-                    }
-                ]
-                return default_patterns
+                return [dict(pattern) for pattern in self._DEFAULT_SQL_PATTERNS]
             
             return result_patterns
             
         except Exception as e:
             logger.error(f"Error extracting SQL patterns: {str(e)}")
             # Return some default patterns to ensure subsequent processing doesn't fail
-            default_patterns = [
-                {
-                    "pattern": "SELECT * FROM {table} WHERE {condition}",
-                    "type": "SELECT",
-                    "frequency": 1,
-                    "examples": "[]",
-                    "comments": "[]",
-                    "tables": "[]"
-                },
-                {
-                    "pattern": "SELECT {columns} FROM {table} GROUP BY {group_by} ORDER BY {order_by} LIMIT {limit}",
-                    "type": "SELECT",
-                    "frequency": 1,
-                    "examples": "[]",
-                    "comments": "[]",
-                    "tables": "[]"
-                }
-            ]
-            return default_patterns
+            return [dict(pattern) for pattern in self._DEFAULT_SQL_PATTERNS]
     
-    def _simplify_sql(self, sql: str) -> str:
+    @staticmethod
+    def _get_sql_type(sql: str) -> Optional[str]:
         """
-        Simplify SQL for better pattern recognition
+        Get the type of a SQL statement
+        
+        Args:
+            sql: SQL query, without leading comments (e.g. simplified by _simplify_sql)
+            
+        Returns:
+            Optional[str]: The statement's first keyword in upper case (SELECT, INSERT, ...), None if there is none
+        """
+        match = _RE_FIRST_KEYWORD.match(sql)
+        return match.group(1).upper() if match else None
+    
+    @staticmethod
+    @lru_cache(maxsize=SQL_ANALYSIS_CACHE_SIZE)
+    def _simplify_sql(sql: str) -> str:
+        """
+        Simplify SQL for better pattern recognition (memoized)
         
         Args:
             sql: SQL query
@@ -1005,62 +1590,45 @@ class MetadataExtractor:
             str: Simplified SQL
         """
         # Remove comments
-        sql = re.sub(r'--.*?(\n|$)', ' ', sql)
-        sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.DOTALL)
+        sql = _RE_LINE_COMMENT.sub(' ', sql)
+        sql = _RE_BLOCK_COMMENT.sub(' ', sql)
         
         # Replace string and numeric constants
-        sql = re.sub(r"'[^']*'", "'?'", sql)
-        sql = re.sub(r'\b\d+\b', '?', sql)
+        sql = _RE_STRING_LITERAL.sub("'?'", sql)
+        sql = _RE_NUMBER_LITERAL.sub('?', sql)
         
         # Replace contents of IN clauses
-        sql = re.sub(r'IN\s*\([^)]+\)', 'IN (?)', sql, flags=re.IGNORECASE)
+        sql = _RE_IN_CLAUSE.sub('IN (?)', sql)
         
         # Remove excess whitespace
-        sql = re.sub(r'\s+', ' ', sql).strip()
+        sql = _RE_WHITESPACE.sub(' ', sql).strip()
         
         return sql
     
     
-    def _extract_tables_from_sql(self, sql: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=SQL_ANALYSIS_CACHE_SIZE)
+    def _extract_tables_from_sql(sql: str) -> Tuple[str, ...]:
         """
-        Extract table names from SQL
+        Extract table names from SQL (memoized)
         
         Args:
             sql: SQL query
             
         Returns:
-            List[str]: List of table names
+            Tuple[str, ...]: Table names, a tuple so the cached result cannot be modified
         """
         # This is a very simplified implementation
         # Real applications require more complex SQL parsing
         tables = set()
         
-        # Find table names after FROM clause
-        from_matches = re.finditer(r'\bFROM\s+`?(\w+)`?', sql, re.IGNORECASE)
-        for match in from_matches:
-            tables.add(match.group(1))
+        first_keyword = _RE_FIRST_KEYWORD.match(sql)
+        sql_type = first_keyword.group(1).upper() if first_keyword else None
+        for regex in _TABLE_PATTERNS_BY_TYPE.get(sql_type, _ALL_TABLE_PATTERNS):
+            for match in regex.finditer(sql):
+                tables.add(match.group(1))
         
-        # Find table names after JOIN clause
-        join_matches = re.finditer(r'\bJOIN\s+`?(\w+)`?', sql, re.IGNORECASE)
-        for match in join_matches:
-            tables.add(match.group(1))
-        
-        # Find table names after INSERT INTO
-        insert_matches = re.finditer(r'\bINSERT\s+INTO\s+`?(\w+)`?', sql, re.IGNORECASE)
-        for match in insert_matches:
-            tables.add(match.group(1))
-        
-        # Find table names after UPDATE
-        update_matches = re.finditer(r'\bUPDATE\s+`?(\w+)`?', sql, re.IGNORECASE)
-        for match in update_matches:
-            tables.add(match.group(1))
-        
-        # Find table names after DELETE FROM
-        delete_matches = re.finditer(r'\bDELETE\s+FROM\s+`?(\w+)`?', sql, re.IGNORECASE)
-        for match in delete_matches:
-            tables.add(match.group(1))
-        
-        return list(tables)
+        return tuple(tables)
     
     
     
@@ -1077,7 +1645,7 @@ class MetadataExtractor:
         """
         try:
             # Get partition information
-            query = f"""
+            query = """
             SELECT 
                 PARTITION_NAME,
                 PARTITION_EXPRESSION,
@@ -1086,11 +1654,11 @@ class MetadataExtractor:
             FROM 
                 information_schema.partitions
             WHERE 
-                TABLE_SCHEMA = '{db_name}'
-                AND TABLE_NAME = '{table_name}'
+                TABLE_SCHEMA = %s
+                AND TABLE_NAME = %s
             """
             
-            partitions = execute_query(query)
+            partitions = execute_query(query, params=(db_name, table_name))
             
             if not partitions:
                 return {}
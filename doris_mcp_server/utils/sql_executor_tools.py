@@ -8,21 +8,28 @@ Responsible for executing SQL queries and handling results
 """
 
 import os
-import json
+import asyncio
 import logging
 import traceback
 import time
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Tuple
 import re
-import datetime
 from decimal import Decimal
 
+from doris_mcp_server.utils import json_utils
+
 # Get logger
 logger = logging.getLogger("doris-mcp.sql-executor")
 
 # Add environment variable control for whether to perform SQL security checks
 ENABLE_SQL_SECURITY_CHECK = os.environ.get('ENABLE_SQL_SECURITY_CHECK', 'true').lower() == 'true'
 
+# Security check results are memoized for statements up to this many characters, longer
+# statements (e.g. bulk INSERTs) are checked every time rather than kept as cache keys
+SQL_SECURITY_CACHE_MAX_LENGTH = 4096
+SQL_SECURITY_CACHE_SIZE = 2048
+
 async def execute_sql_query(ctx) -> Dict[str, Any]:
     """
     Execute SQL query and return results
@@ -42,7 +49,8 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
 
         sql = params.get("sql")
         db_name = params.get("db_name", os.getenv("DB_DATABASE", ""))
-        max_rows = params.get("max_rows", 1000)  # Maximum number of rows to return
+        # Maximum number of rows to return, an int since it is appended to the statement as its LIMIT
+        max_rows = int(params.get("max_rows", 1000))
         timeout = params.get("timeout", 30)  # Timeout in seconds
         
         if not sql:
@@ -50,11 +58,11 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps({
+                        "text": json_utils.dumps({
                             "success": False,
                             "error": "Missing SQL parameter",
                             "message": "Please provide the SQL query to execute"
-                        }, ensure_ascii=False)
+                        }, default=_json_default)
                     }
                 ]
             }
@@ -66,12 +74,12 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps({
+                        "text": json_utils.dumps({
                             "success": False,
                             "error": "SQL security check failed",
                             "message": "Query contains unsafe operations and cannot be executed",
                             "security_issues": security_result.get("security_issues", [])
-                        }, ensure_ascii=False)
+                        }, default=_json_default)
                     }
                 ]
             }
@@ -84,18 +92,17 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps({
+                        "text": json_utils.dumps({
                             "success": False,
                             "error": "Missing SQL parameter",
                             "message": "Please provide the SQL query to execute"
-                        }, ensure_ascii=False)
+                        }, default=_json_default)
                     }
                 ]
             }
         
-        # Ensure SELECT statements include a LIMIT clause
-        sql_lower = sql.lower().strip()
-        if sql_lower.startswith("select") and "limit" not in sql_lower:
+        # Ensure SELECT statements include a LIMIT clause, only SELECTs are lower-cased to look for it
+        if sql.lstrip()[:6].lower() == "select" and "limit" not in sql.lower():
             sql = sql.rstrip(";") + f" LIMIT {max_rows};"
         
         # Start timer
@@ -103,7 +110,8 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
         
         # Execute query
         try:
-            result = execute_query(sql, db_name)
+            # Run the blocking driver call in a worker thread to keep the event loop responsive
+            result = await asyncio.to_thread(execute_query, sql, db_name)
             
             # Calculate execution time
             execution_time = time.time() - start_time
@@ -113,45 +121,37 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                 # Handle list of query results
                 row_count = len(result)
                 
-                # Extract column names
-                if hasattr(result[0], "_fields"):
+                # Only the returned rows are converted, all rows share the type of the first one.
+                # Special types (date, time, Decimal) are handled by _json_default when the
+                # response is serialized
+                rows = result[:max_rows]
+                first_row = result[0] if result else None
+                if hasattr(first_row, "_fields"):
                     # If it's a named tuple
-                    columns = list(result[0]._fields)
+                    columns = list(first_row._fields)
+                    data = [row._asdict() for row in rows]
+                elif isinstance(first_row, dict):
+                    # If it's a dictionary
+                    columns = list(first_row.keys())
+                    data = rows
                 else:
-                    # Otherwise, assume it's a dictionary
-                    columns = list(result[0].keys()) if isinstance(result[0], dict) else []
-                
-                # Convert results to serializable format
-                data = []
-                for row in result:
-                    row_dict = {}
-                    if hasattr(row, "_asdict"):
-                        # If it's a named tuple
-                        row_dict = row._asdict()
-                    elif isinstance(row, dict):
-                        # If it's a dictionary
-                        row_dict = row
-                    else:
-                        # If it's a list or tuple
-                        row_dict = dict(zip(columns, row)) if columns else row
-                    
-                    # Handle special types to make them JSON serializable
-                    serialized_row = _serialize_row_data(row_dict)
-                    data.append(serialized_row)
+                    # If it's a list or tuple (or there are no rows), without column names
+                    columns = []
+                    data = rows
                 
                 return {
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps({
+                            "text": json_utils.dumps({
                                 "success": True,
                                 "sql": sql,
                                 "row_count": row_count,
                                 "columns": columns,
-                                "data": data[:max_rows],  # Limit returned rows
+                                "data": data,  # Limited to max_rows
                                 "execution_time": execution_time,
                                 "truncated": row_count > max_rows
-                            }, ensure_ascii=False)
+                            }, default=_json_default)
                         }
                     ]
                 }
@@ -163,12 +163,11 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                     "result": str(result),
                     "execution_time": execution_time
                 }
-                other_response = _serialize_row_data(other_response)
                 return {
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(other_response, ensure_ascii=False)
+                            "text": json_utils.dumps(other_response, default=_json_default)
                         }
                     ]
                 }
@@ -200,14 +199,11 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
                 "db_name": db_name
             }
             
-            # Ensure error response is also serializable
-            error_response = _serialize_row_data(error_response)
-            
             return {
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(error_response, ensure_ascii=False)
+                        "text": json_utils.dumps(error_response, default=_json_default)
                     }
                 ]
             }
@@ -222,18 +218,63 @@ async def execute_sql_query(ctx) -> Dict[str, Any]:
             "message": "Error occurred while executing SQL query"
         }
         
-        # Ensure error response is also serializable
-        error_response = _serialize_row_data(error_response)
-        
         return {
             "content": [
                 {
                     "type": "text",
-                    "text": json.dumps(error_response, ensure_ascii=False)
+                    "text": json_utils.dumps(error_response, default=_json_default)
                 }
             ]
         }
 
+# Dangerous operations (checked for both read-only and non-read-only queries), every pattern starts with \b
+_DANGEROUS_OPERATION_PATTERNS = [
+    (r'\bdelete\b', "DELETE operation"),
+    (r'\bdrop\b', "DROP TABLE/DATABASE operation"),
+    (r'\btruncate\b', "TRUNCATE TABLE operation"),
+    (r'\bupdate\b', "UPDATE operation"),
+    (r'\binsert\b', "INSERT operation"),
+    (r'\balter\b', "ALTER TABLE structure operation"),
+    (r'\bcreate\b', "CREATE TABLE/DATABASE operation"),
+    (r'\bgrant\b', "GRANT operation"),
+    (r'\brevoke\b', "REVOKE permission operation"),
+    (r'\bexec\b', "EXECUTE stored procedure"),
+    (r'\bxp_', "Extended stored procedure, potential security risk"),
+    (r'\bshutdown\b', "SHUTDOWN database operation"),
+    (r'\bunion\s+all\s+select\b', "UNION statement, potential SQL injection"),
+    (r'\bunion\s+select\b', "UNION statement, potential SQL injection"),
+    (r'\binto\s+outfile\b', "Write to file operation"),
+    (r'\bload_file\b', "Load file operation")
+]
+
+# Compiled once at import: (reported operation, compiled pattern, description, compiled DDL/DML usage pattern or None)
+# The usage pattern is what makes the keyword dangerous inside a read-only query, e.g. CREATE TABLE
+_DDL_DML_KEYWORDS = (r'\bcreate\b', r'\bdrop\b', r'\bdelete\b', r'\binsert\b', r'\bupdate\b', r'\balter\b')
+_DANGEROUS_OPERATIONS = [
+    (
+        operation.replace(r'\b', '').replace(r'\s+', ' '),
+        re.compile(operation),
+        description,
+        re.compile(operation + r'\s+(?:table|database|view|index|procedure|function|trigger|event)')
+        if operation in _DDL_DML_KEYWORDS else None
+    )
+    for operation, description in _DANGEROUS_OPERATION_PATTERNS
+]
+
+# All dangerous operation patterns as one alternation, so the statement is scanned once. The \b
+# is factored out and there are no groups, which keeps the scan several times faster than the
+# individual searches; the operation is identified only where the alternation matched
+_RE_DANGEROUS_OPERATION = re.compile(
+    r'\b(?:' + '|'.join(operation[2:] for operation, _ in _DANGEROUS_OPERATION_PATTERNS) + ')'
+)
+
+# Dangerous operations checked only for non-read-only queries
+# (reported operation, substring, description)
+_NON_READONLY_OPERATIONS = [
+    ('--', '--', "SQL comment, potential SQL injection"),
+    ('/\\*', '/*', "SQL block comment, potential SQL injection")
+]
+
 # Helper function
 async def _check_sql_security(sql: str) -> Dict[str, Any]:
     """Check SQL security"""
@@ -243,107 +284,86 @@ async def _check_sql_security(sql: str) -> Dict[str, Any]:
             "is_safe": True,
             "security_issues": []
         }
-        
+    
+    # The result depends only on the statement text (literals included), so repeated
+    # statements reuse it
+    if len(sql) <= SQL_SECURITY_CACHE_MAX_LENGTH:
+        issues = _find_security_issues_cached(sql)
+    else:
+        issues = _find_security_issues(sql)
+    security_issues = [dict(issue) for issue in issues]
+    
+    return {
+        "is_safe": len(security_issues) == 0,
+        "security_issues": security_issues
+    }
+
+def _find_security_issues(sql: str) -> Tuple[Dict[str, str], ...]:
+    """Find the dangerous operations in a statement, see _check_sql_security"""
     # Check if SQL contains dangerous operations
     sql_lower = sql.lower()
     
     # Check if it's a read-only query type
     is_read_only = sql_lower.strip().startswith(("select ", "show ", "desc ", "describe ", "explain "))
     
-    # Define list of dangerous operations (checked for both read-only and non-read-only queries)
-    dangerous_operations = [
-        (r'\bdelete\b', "DELETE operation"),
-        (r'\bdrop\b', "DROP TABLE/DATABASE operation"),
-        (r'\btruncate\b', "TRUNCATE TABLE operation"),
-        (r'\bupdate\b', "UPDATE operation"),
-        (r'\binsert\b', "INSERT operation"),
-        (r'\balter\b', "ALTER TABLE structure operation"),
-        (r'\bcreate\b', "CREATE TABLE/DATABASE operation"),
-        (r'\bgrant\b', "GRANT operation"),
-        (r'\brevoke\b', "REVOKE permission operation"),
-        (r'\bexec\b', "EXECUTE stored procedure"),
-        (r'\bxp_', "Extended stored procedure, potential security risk"),
-        (r'\bshutdown\b', "SHUTDOWN database operation"),
-        (r'\bunion\s+all\s+select\b', "UNION statement, potential SQL injection"),
-        (r'\bunion\s+select\b', "UNION statement, potential SQL injection"),
-        (r'\binto\s+outfile\b', "Write to file operation"),
-        (r'\bload_file\b', "Load file operation")
-    ]
-    
-    # Dangerous operations checked only for non-read-only queries
-    non_readonly_operations = []
-    if not is_read_only:
-        non_readonly_operations = [
-            (r'--', "SQL comment, potential SQL injection"),
-            (r'/\*', "SQL block comment, potential SQL injection")
-        ]
-    
     # Check if dangerous operations are included
     security_issues = []
     
+    # Find the dangerous operations present in one scan, reported in the order they are defined
+    found = set()
+    for match in _RE_DANGEROUS_OPERATION.finditer(sql_lower):
+        for index, (_, regex, _, _) in enumerate(_DANGEROUS_OPERATIONS):
+            if regex.match(sql_lower, match.start()):
+                found.add(index)
+                break
+    
     # Check dangerous operations applicable to all queries
-    for operation, description in dangerous_operations:
-        if re.search(operation, sql_lower):
-            # For specific keywords in read-only queries, differentiate if used as independent operations
-            if is_read_only and operation in [r'\bcreate\b', r'\bdrop\b', r'\bdelete\b', r'\binsert\b', r'\bupdate\b', r'\balter\b']:
-                # Check if used as DDL/DML keyword, e.g., CREATE TABLE, DROP DATABASE
-                pattern = operation + r'\s+(?:table|database|view|index|procedure|function|trigger|event)'
-                if re.search(pattern, sql_lower):
-                    security_issues.append({
-                        "operation": operation.replace(r'\b', '').replace(r'\s+', ' '),
-                        "description": description,
-                        "severity": "High"
-                    })
-            else:
+    for index in sorted(found):
+        operation, _, description, usage_regex = _DANGEROUS_OPERATIONS[index]
+        # For specific keywords in read-only queries, differentiate if used as independent operations
+        if is_read_only and usage_regex is not None:
+            # Check if used as DDL/DML keyword, e.g., CREATE TABLE, DROP DATABASE
+            if usage_regex.search(sql_lower):
                 security_issues.append({
-                    "operation": operation.replace(r'\b', '').replace(r'\s+', ' '),
+                    "operation": operation,
                     "description": description,
                     "severity": "High"
                 })
-    
-    # Check dangerous operations specific to non-read-only queries
-    for operation, description in non_readonly_operations:
-        if re.search(operation, sql_lower):
+        else:
             security_issues.append({
-                "operation": operation.replace(r'\b', '').replace(r'\s+', ' '),
+                "operation": operation,
                 "description": description,
-                "severity": "Medium"
+                "severity": "High"
             })
+
+    # Check dangerous operations specific to non-read-only queries
+    if not is_read_only:
+        for operation, substring, description in _NON_READONLY_OPERATIONS:
+            if substring in sql_lower:
+                security_issues.append({
+                    "operation": operation,
+                    "description": description,
+                    "severity": "Medium"
+                })
     
-    return {
-        "is_safe": len(security_issues) == 0,
-        "security_issues": security_issues
-    }
+    return tuple(security_issues)
 
-def _serialize_row_data(row_data: Dict[str, Any]) -> Dict[str, Any]:
+_find_security_issues_cached = lru_cache(maxsize=SQL_SECURITY_CACHE_SIZE)(_find_security_issues)
+
+def _json_default(value: Any) -> Any:
     """
-    Convert special types in row data (like date, time, Decimal) to JSON serializable format
+    Convert special types in result rows (like date, time, Decimal) to a JSON serializable form
+    
+    Used as the json_utils.dumps fallback, which serializes everything else natively.
     
     Args:
-        row_data: Row data dictionary
+        value: Value that is not natively serializable
         
     Returns:
-        Dict[str, Any]: Processed serializable dictionary
+        Any: float for Decimal, ISO format string for date and time types, str() otherwise
     """
-    serialized_data = {}
-    for key, value in row_data.items():
-        if value is None:
-            serialized_data[key] = None
-        elif isinstance(value, (datetime.date, datetime.datetime)):
-            # Convert date and time types to ISO format string
-            serialized_data[key] = value.isoformat()
-        elif isinstance(value, Decimal):
-            # Convert Decimal type to float
-            serialized_data[key] = float(value)
-        elif isinstance(value, (list, tuple)):
-            # Recursively process elements in list or tuple
-            serialized_data[key] = [
-                _serialize_row_data(item) if isinstance(item, dict) else item
-                for item in value
-            ]
-        elif isinstance(value, dict):
-            # Recursively process nested dictionaries
-            serialized_data[key] = _serialize_row_data(value)
-        else:
-            serialized_data[key] = value
-    return serialized_data 
\ No newline at end of file
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
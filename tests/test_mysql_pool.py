@@ -0,0 +1,114 @@
+"""Tests for the MySQL connection pool"""
+
+import threading
+import time
+
+import pytest
+
+from doris_mcp_server.utils import db_driver, dbMysql
+from doris_mcp_server.utils.dbMysql import _ConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.fail_queries:
+            raise RuntimeError("query failed")
+
+    def fetchall(self):
+        return [{"x": 1}]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.fail_queries = False
+
+    def cursor(self, cursorclass=None):
+        return FakeCursor(self)
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Connections opened through db_driver.connect, in order"""
+    opened = []
+
+    def connect(**config):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    def ping(conn):
+        if not conn.alive:
+            raise ConnectionError("server has gone away")
+
+    monkeypatch.setattr(db_driver, "connect", connect)
+    monkeypatch.setattr(db_driver, "ping", ping)
+    return opened
+
+
+def test_connection_blocks_at_max_size_until_released(connections):
+    pool = _ConnectionPool({"database": "db"}, max_size=1, timeout=5)
+    first = pool.connection()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.connection()))
+    waiter.start()
+
+    time.sleep(0.1)
+    assert not acquired
+
+    first.close()
+    waiter.join(timeout=5)
+    assert len(acquired) == 1
+    assert len(connections) == 1
+
+
+def test_connection_times_out_when_pool_stays_full(connections):
+    pool = _ConnectionPool({"database": "db"}, max_size=1, timeout=0.1)
+    pool.connection()
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.connection()
+    assert time.monotonic() - start >= 0.1
+    assert len(connections) == 1
+
+
+def test_connection_failing_ping_is_discarded(connections):
+    pool = _ConnectionPool({"database": "db"}, max_size=1, ping_interval=0)
+    pool.connection().close()
+    connections[0].alive = False
+
+    time.sleep(0.01)
+    conn = pool.connection()
+
+    assert not connections[0].open
+    assert len(connections) == 2
+    assert conn._conn is connections[1]
+
+
+def test_connection_is_released_after_query_error(connections, monkeypatch):
+    pool = _ConnectionPool({"database": "db"}, max_size=1, timeout=0.1)
+    monkeypatch.setitem(dbMysql._POOLS, ("db", False), pool)
+
+    pool.connection().close()
+    connections[0].fail_queries = True
+    with pytest.raises(RuntimeError):
+        dbMysql.execute_query_mysql("SELECT 1", db_name="db")
+
+    # The slot was freed, so the single connection can be checked out again
+    connections[0].fail_queries = False
+    assert dbMysql.execute_query_mysql("SELECT 1", db_name="db") == [{"x": 1}]
+    assert len(connections) == 1
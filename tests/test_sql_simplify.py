@@ -0,0 +1,25 @@
+"""Tests for the SQL simplification used by SQL pattern extraction"""
+
+import pytest
+
+from doris_mcp_server.utils.schema_extractor import MetadataExtractor, _RE_STRING_LITERAL
+
+
+@pytest.mark.parametrize("literal", [
+    "'it''s'",
+    r"'a\'b'",
+    '"say ""hi"""',
+    r'"a\"b"',
+])
+def test_string_literal_matches_whole_literal(literal):
+    sql = f"SELECT * FROM t WHERE a = {literal} AND b = 'x'"
+    assert _RE_STRING_LITERAL.findall(sql) == [literal, "'x'"]
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t WHERE a = 'it''s' AND b = 1", "SELECT * FROM t WHERE a = '?' AND b = ?"),
+    (r"SELECT * FROM t WHERE a = 'a\'b' AND b = 'x'", "SELECT * FROM t WHERE a = '?' AND b = '?'"),
+    ('SELECT * FROM t WHERE a = "say ""hi""" AND b = 2', "SELECT * FROM t WHERE a = '?' AND b = ?"),
+])
+def test_simplify_sql_replaces_quoted_strings(sql, expected):
+    assert MetadataExtractor._simplify_sql(sql) == expected